@@ -49,7 +49,7 @@ def get_health_score():
     history = data_manager.load_purchase_history()
     
     # Calculate health score based on shopping patterns
-    rating = recommendation_engine.rate_shopping_list_healthiness(shopping_list)
+    rating = recommendation_engine.rate_shopping_list_healthiness(shopping_list, include_breakdown=False)
     
     # Mock additional health metrics for frontend
     health_data = {
@@ -107,7 +107,7 @@ def get_nutritional_analysis():
     history = data_manager.load_purchase_history()
     
     # Get basic rating
-    rating = recommendation_engine.rate_shopping_list_healthiness(shopping_list)
+    rating = recommendation_engine.rate_shopping_list_healthiness(shopping_list, include_breakdown=False)
     
     # Enhanced analysis for frontend
     analysis = {
@@ -3,7 +3,7 @@ Smart Recipe Integration API Routes
 Provides endpoints for recipe recommendations, meal planning, and cooking optimization
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from datetime import datetime
 import traceback
 
@@ -16,8 +16,47 @@ except ImportError:
 # Create blueprint
 recipe_bp = Blueprint('recipe', __name__)
 
-# Initialize recipe engine
-recipe_engine = RecipeEngine()
+# Recipe engine is created on first use so importing the blueprint stays cheap
+_recipe_engine = None
+
+def get_engine():
+    """Return the shared RecipeEngine, creating it on first call"""
+    global _recipe_engine
+    if _recipe_engine is None:
+        _recipe_engine = RecipeEngine()
+    return _recipe_engine
+
+# Recipe data only changes on reload, so deterministic endpoints are cacheable
+_CACHE_MAX_AGE = 3600
+
+def _find_recipe(recipe_id):
+    """Look up a recipe by id, or None if it does not exist"""
+    return get_engine().get_recipe(recipe_id)
+
+def _with_cache_headers(response, etag):
+    """Mark a response as publicly cacheable under the given ETag"""
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = _CACHE_MAX_AGE
+    return response
+
+def _not_modified(etag):
+    """Return a 304 response if the client already holds this ETag"""
+    if etag in request.if_none_match:
+        return _with_cache_headers(Response(status=304), etag)
+    return None
+
+def _format_meal(recipe):
+    """Compact recipe entry used inside meal plans"""
+    if not recipe:
+        return None
+    return {
+        'id': recipe.id,
+        'name': recipe.name,
+        'prep_time': recipe.prep_time,
+        'cook_time': recipe.cook_time,
+        'nutrition': recipe.to_dict()['nutrition']
+    }
 
 @recipe_bp.route('/api/recipe/search', methods=['GET'])
 def search_recipes():
@@ -38,27 +77,12 @@ def search_recipes():
         if request.args.get('dietary_tags'):
             filters['dietary_tags'] = request.args.get('dietary_tags').split(',')
         
-        results = recipe_engine.search_recipes(query, filters)
-        
-        # Convert Recipe objects to dictionaries
-        formatted_results = []
-        for result in results:
-            recipe_dict = {
-                'id': result['recipe'].id,
-                'name': result['recipe'].name,
-                'description': result['recipe'].description,
-                'prep_time': result['recipe'].prep_time,
-                'cook_time': result['recipe'].cook_time,
-                'servings': result['recipe'].servings,
-                'difficulty': result['recipe'].difficulty,
-                'cuisine_type': result['recipe'].cuisine_type,
-                'dietary_tags': result['recipe'].dietary_tags,
-                'nutrition': result['recipe'].nutrition,
-                'rating': result['recipe'].rating,
-                'image_url': result['recipe'].image_url,
-                'relevance_score': result['relevance_score']
-            }
-            formatted_results.append(recipe_dict)
+        results = get_engine().search_recipes(query, filters)
+        
+        formatted_results = [
+            {**result['recipe'].to_summary_dict(), 'relevance_score': result['relevance_score']}
+            for result in results
+        ]
         
         return jsonify({
             'success': True,
@@ -93,31 +117,17 @@ def get_recipe_recommendations():
         if request.args.get('disliked_ingredients'):
             preferences['disliked_ingredients'] = request.args.get('disliked_ingredients').split(',')
         
-        recommendations = recipe_engine.get_recipe_recommendations(preferences if preferences else None)
-        
-        # Convert Recipe objects to dictionaries
-        formatted_recommendations = []
-        for rec in recommendations:
-            recipe_dict = {
-                'id': rec['recipe'].id,
-                'name': rec['recipe'].name,
-                'description': rec['recipe'].description,
-                'ingredients': rec['recipe'].ingredients,
-                'instructions': rec['recipe'].instructions,
-                'prep_time': rec['recipe'].prep_time,
-                'cook_time': rec['recipe'].cook_time,
-                'servings': rec['recipe'].servings,
-                'difficulty': rec['recipe'].difficulty,
-                'cuisine_type': rec['recipe'].cuisine_type,
-                'dietary_tags': rec['recipe'].dietary_tags,
-                'nutrition': rec['recipe'].nutrition,
-                'rating': rec['recipe'].rating,
-                'image_url': rec['recipe'].image_url,
+        recommendations = get_engine().get_recipe_recommendations(preferences if preferences else None)
+        
+        formatted_recommendations = [
+            {
+                **rec['recipe'].to_dict(),
                 'recommendation_score': rec['recommendation_score'],
                 'score_factors': rec['score_factors'],
                 'dietary_compatible': rec['dietary_compatible']
             }
-            formatted_recommendations.append(recipe_dict)
+            for rec in recommendations
+        ]
         
         return jsonify({
             'success': True,
@@ -147,31 +157,17 @@ def find_recipes_by_ingredients():
         available_ingredients = data['ingredients']
         match_threshold = data.get('match_threshold', 0.6)
         
-        matches = recipe_engine.find_recipes_by_ingredients(available_ingredients, match_threshold)
-        
-        # Convert Recipe objects to dictionaries
-        formatted_matches = []
-        for match in matches:
-            recipe_dict = {
-                'id': match['recipe'].id,
-                'name': match['recipe'].name,
-                'description': match['recipe'].description,
-                'ingredients': match['recipe'].ingredients,
-                'instructions': match['recipe'].instructions,
-                'prep_time': match['recipe'].prep_time,
-                'cook_time': match['recipe'].cook_time,
-                'servings': match['recipe'].servings,
-                'difficulty': match['recipe'].difficulty,
-                'cuisine_type': match['recipe'].cuisine_type,
-                'dietary_tags': match['recipe'].dietary_tags,
-                'nutrition': match['recipe'].nutrition,
-                'rating': match['recipe'].rating,
-                'image_url': match['recipe'].image_url,
+        matches = get_engine().find_recipes_by_ingredients(available_ingredients, match_threshold)
+        
+        formatted_matches = [
+            {
+                **match['recipe'].to_dict(),
                 'match_score': match['match_score'],
                 'missing_ingredients': match['missing_ingredients'],
                 'missing_count': match['missing_count']
             }
-            formatted_matches.append(recipe_dict)
+            for match in matches
+        ]
         
         return jsonify({
             'success': True,
@@ -204,7 +200,7 @@ def optimize_cooking_time():
         
         recipe_ids = data['recipe_ids']
         
-        optimization = recipe_engine.optimize_cooking_time(recipe_ids)
+        optimization = get_engine().optimize_cooking_time(recipe_ids)
         
         return jsonify({
             'success': True,
@@ -233,7 +229,7 @@ def get_ingredient_substitutions():
         recipe_id = data['recipe_id']
         unavailable_ingredients = data['unavailable_ingredients']
         
-        substitutions = recipe_engine.suggest_ingredient_substitutions(recipe_id, unavailable_ingredients)
+        substitutions = get_engine().suggest_ingredient_substitutions(recipe_id, unavailable_ingredients)
         
         return jsonify({
             'success': True,
@@ -251,39 +247,21 @@ def get_ingredient_substitutions():
 def generate_meal_plan():
     """Generate a meal plan"""
     try:
-        data = request.get_json() if request.get_json() else {}
+        data = request.get_json() or {}
         
         days = data.get('days', 7)
         dietary_preferences = data.get('dietary_preferences', [])
         
-        meal_plans = recipe_engine.generate_meal_plan(days, dietary_preferences)
+        meal_plans = get_engine().generate_meal_plan(days, dietary_preferences)
         
         # Convert MealPlan objects to dictionaries
         formatted_meal_plans = []
         for meal_plan in meal_plans:
             meal_dict = {
                 'date': meal_plan.date,
-                'breakfast': {
-                    'id': meal_plan.breakfast.id,
-                    'name': meal_plan.breakfast.name,
-                    'prep_time': meal_plan.breakfast.prep_time,
-                    'cook_time': meal_plan.breakfast.cook_time,
-                    'nutrition': meal_plan.breakfast.nutrition
-                } if meal_plan.breakfast else None,
-                'lunch': {
-                    'id': meal_plan.lunch.id,
-                    'name': meal_plan.lunch.name,
-                    'prep_time': meal_plan.lunch.prep_time,
-                    'cook_time': meal_plan.lunch.cook_time,
-                    'nutrition': meal_plan.lunch.nutrition
-                } if meal_plan.lunch else None,
-                'dinner': {
-                    'id': meal_plan.dinner.id,
-                    'name': meal_plan.dinner.name,
-                    'prep_time': meal_plan.dinner.prep_time,
-                    'cook_time': meal_plan.dinner.cook_time,
-                    'nutrition': meal_plan.dinner.nutrition
-                } if meal_plan.dinner else None,
+                'breakfast': _format_meal(meal_plan.breakfast),
+                'lunch': _format_meal(meal_plan.lunch),
+                'dinner': _format_meal(meal_plan.dinner),
                 'snack': meal_plan.snack,  # Currently None
                 'total_nutrition': meal_plan.total_nutrition,
                 'estimated_cost': meal_plan.estimated_cost
@@ -308,12 +286,19 @@ def generate_meal_plan():
 def get_nutrition_analysis(recipe_id):
     """Get detailed nutrition analysis for a recipe"""
     try:
-        analysis = recipe_engine.get_recipe_nutrition_analysis(recipe_id)
+        recipe = _find_recipe(recipe_id)
+        if recipe:
+            not_modified = _not_modified(recipe.etag)
+            if not_modified:
+                return not_modified
         
-        return jsonify({
+        analysis = get_engine().get_recipe_nutrition_analysis(recipe_id)
+        
+        response = jsonify({
             'success': True,
             'analysis': analysis
         })
+        return _with_cache_headers(response, recipe.etag) if recipe else response
         
     except Exception as e:
         return jsonify({
@@ -326,11 +311,7 @@ def get_nutrition_analysis(recipe_id):
 def get_recipe_details(recipe_id):
     """Get detailed recipe information"""
     try:
-        recipe = None
-        for r in recipe_engine.recipes:
-            if r.id == recipe_id:
-                recipe = r
-                break
+        recipe = _find_recipe(recipe_id)
         
         if not recipe:
             return jsonify({
@@ -338,27 +319,14 @@ def get_recipe_details(recipe_id):
                 'error': 'Recipe not found'
             }), 404
         
-        recipe_dict = {
-            'id': recipe.id,
-            'name': recipe.name,
-            'description': recipe.description,
-            'ingredients': recipe.ingredients,
-            'instructions': recipe.instructions,
-            'prep_time': recipe.prep_time,
-            'cook_time': recipe.cook_time,
-            'servings': recipe.servings,
-            'difficulty': recipe.difficulty,
-            'cuisine_type': recipe.cuisine_type,
-            'dietary_tags': recipe.dietary_tags,
-            'nutrition': recipe.nutrition,
-            'rating': recipe.rating,
-            'image_url': recipe.image_url
-        }
+        not_modified = _not_modified(recipe.etag)
+        if not_modified:
+            return not_modified
         
-        return jsonify({
+        return _with_cache_headers(jsonify({
             'success': True,
-            'recipe': recipe_dict
-        })
+            'recipe': recipe.to_dict()
+        }), recipe.etag)
         
     except Exception as e:
         return jsonify({
@@ -371,34 +339,50 @@ def get_recipe_details(recipe_id):
 def get_recipe_categories():
     """Get available recipe categories and filters"""
     try:
-        # Extract unique values from all recipes
-        cuisines = list(set(recipe.cuisine_type for recipe in recipe_engine.recipes))
-        difficulties = list(set(recipe.difficulty for recipe in recipe_engine.recipes))
-        dietary_tags = list(set(tag for recipe in recipe_engine.recipes for tag in recipe.dietary_tags))
-        
-        # Get time ranges
-        prep_times = [recipe.prep_time for recipe in recipe_engine.recipes]
-        cook_times = [recipe.cook_time for recipe in recipe_engine.recipes]
+        engine = get_engine()
+        not_modified = _not_modified(engine.catalog_etag)
+        if not_modified:
+            return not_modified
+        
+        recipes = engine.recipes
+        
+        # Collect unique values and time ranges in a single pass over all recipes
+        cuisines, difficulties, dietary_tags = set(), set(), set()
+        prep_min = prep_max = cook_min = cook_max = None
+        for recipe in recipes:
+            cuisines.add(recipe.cuisine_type)
+            difficulties.add(recipe.difficulty)
+            dietary_tags.update(recipe.dietary_tags)
+            
+            prep, cook = recipe.prep_time, recipe.cook_time
+            if prep_min is None or prep < prep_min:
+                prep_min = prep
+            if prep_max is None or prep > prep_max:
+                prep_max = prep
+            if cook_min is None or cook < cook_min:
+                cook_min = cook
+            if cook_max is None or cook > cook_max:
+                cook_max = cook
         
         categories = {
             'cuisines': sorted(cuisines),
             'difficulties': sorted(difficulties),
             'dietary_tags': sorted(dietary_tags),
             'prep_time_range': {
-                'min': min(prep_times),
-                'max': max(prep_times)
+                'min': prep_min,
+                'max': prep_max
             },
             'cook_time_range': {
-                'min': min(cook_times),
-                'max': max(cook_times)
+                'min': cook_min,
+                'max': cook_max
             },
-            'total_recipes': len(recipe_engine.recipes)
+            'total_recipes': len(recipes)
         }
         
-        return jsonify({
+        return _with_cache_headers(jsonify({
             'success': True,
             'categories': categories
-        })
+        }), engine.catalog_etag)
         
     except Exception as e:
         return jsonify({
@@ -411,11 +395,7 @@ def get_recipe_categories():
 def generate_shopping_list_for_recipe(recipe_id):
     """Generate shopping list for a specific recipe"""
     try:
-        recipe = None
-        for r in recipe_engine.recipes:
-            if r.id == recipe_id:
-                recipe = r
-                break
+        recipe = _find_recipe(recipe_id)
         
         if not recipe:
             return jsonify({
@@ -423,6 +403,10 @@ def generate_shopping_list_for_recipe(recipe_id):
                 'error': 'Recipe not found'
             }), 404
         
+        not_modified = _not_modified(recipe.etag)
+        if not_modified:
+            return not_modified
+        
         # Convert recipe ingredients to shopping list format
         shopping_list = []
         total_estimated_cost = 0.0
@@ -437,11 +421,11 @@ def generate_shopping_list_for_recipe(recipe_id):
                 'amount': ingredient['amount'],
                 'unit': ingredient['unit'],
                 'optional': ingredient['optional'],
-                'estimated_cost': f"Rs.{estimated_cost:.2f}",
+                'estimated_cost': round(estimated_cost, 2),
                 'category': 'ingredient'  # Could be enhanced with proper categorization
             })
         
-        return jsonify({
+        return _with_cache_headers(jsonify({
             'success': True,
             'recipe_id': recipe_id,
             'recipe_name': recipe.name,
@@ -449,8 +433,9 @@ def generate_shopping_list_for_recipe(recipe_id):
             'total_items': len(shopping_list),
             'required_items': len([item for item in shopping_list if not item['optional']]),
             'optional_items': len([item for item in shopping_list if item['optional']]),
-            'total_estimated_cost': f"Rs.{total_estimated_cost:.2f}"
-        })
+            'total_estimated_cost': round(total_estimated_cost, 2),
+            'currency': 'LKR'
+        }), recipe.etag)
         
     except Exception as e:
         return jsonify({
@@ -469,34 +454,17 @@ def get_random_recipes():
         dietary_filter = request.args.get('dietary_tags', '').split(',') if request.args.get('dietary_tags') else []
         
         # Filter recipes by dietary requirements if specified
-        available_recipes = recipe_engine.recipes
+        available_recipes = get_engine().recipes
         if dietary_filter and dietary_filter != ['']:
             available_recipes = [
-                recipe for recipe in recipe_engine.recipes
+                recipe for recipe in get_engine().recipes
                 if any(tag in recipe.dietary_tags for tag in dietary_filter)
             ]
         
         # Select random recipes
         selected_recipes = random.sample(available_recipes, min(count, len(available_recipes)))
         
-        # Convert to dictionaries
-        formatted_recipes = []
-        for recipe in selected_recipes:
-            recipe_dict = {
-                'id': recipe.id,
-                'name': recipe.name,
-                'description': recipe.description,
-                'prep_time': recipe.prep_time,
-                'cook_time': recipe.cook_time,
-                'servings': recipe.servings,
-                'difficulty': recipe.difficulty,
-                'cuisine_type': recipe.cuisine_type,
-                'dietary_tags': recipe.dietary_tags,
-                'nutrition': recipe.nutrition,
-                'rating': recipe.rating,
-                'image_url': recipe.image_url
-            }
-            formatted_recipes.append(recipe_dict)
+        formatted_recipes = [recipe.to_summary_dict() for recipe in selected_recipes]
         
         return jsonify({
             'success': True,
@@ -1,20 +1,21 @@
 from flask import Blueprint, request, jsonify
-import sys
-import os
-
-# Add src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
-
 from src.models.grocery_item import GroceryItem
 from src.utils.data_manager import DataManager
 
 shopping_bp = Blueprint('shopping', __name__)
-data_manager = DataManager()
+_data_manager = None
+
+def get_data_manager():
+    """Return the shared DataManager, creating it on first call"""
+    global _data_manager
+    if _data_manager is None:
+        _data_manager = DataManager()
+    return _data_manager
 
 @shopping_bp.route('/shopping-list', methods=['GET'])
 def get_shopping_list():
     """Get current shopping list"""
-    shopping_list = data_manager.load_shopping_list()
+    shopping_list = get_data_manager().load_shopping_list()
     return jsonify(shopping_list.to_dict())
 
 @shopping_bp.route('/shopping-list/items', methods=['POST'])
@@ -32,9 +33,9 @@ def add_item_to_list():
         is_organic=data.get('is_organic', False)
     )
     
-    shopping_list = data_manager.load_shopping_list()
+    shopping_list = get_data_manager().load_shopping_list()
     shopping_list.add_item(item)
-    data_manager.save_shopping_list(shopping_list)
+    get_data_manager().save_shopping_list(shopping_list)
     
     return jsonify({'message': 'Item added successfully', 'item': item.to_dict()})
 
@@ -44,11 +45,11 @@ def remove_item_from_list(item_name):
     data = request.get_json() or {}
     category = data.get('category')
     
-    shopping_list = data_manager.load_shopping_list()
+    shopping_list = get_data_manager().load_shopping_list()
     success = shopping_list.remove_item(item_name, category)
     
     if success:
-        data_manager.save_shopping_list(shopping_list)
+        get_data_manager().save_shopping_list(shopping_list)
         return jsonify({'message': 'Item removed successfully'})
     else:
         return jsonify({'error': 'Item not found'}), 404
@@ -60,11 +61,11 @@ def update_item_quantity(item_name):
     new_quantity = data['quantity']
     category = data.get('category')
     
-    shopping_list = data_manager.load_shopping_list()
+    shopping_list = get_data_manager().load_shopping_list()
     success = shopping_list.update_quantity(item_name, new_quantity, category)
     
     if success:
-        data_manager.save_shopping_list(shopping_list)
+        get_data_manager().save_shopping_list(shopping_list)
         return jsonify({'message': 'Quantity updated successfully'})
     else:
         return jsonify({'error': 'Item not found'}), 404
@@ -72,29 +73,13 @@ def update_item_quantity(item_name):
 @shopping_bp.route('/shopping-list/clear', methods=['DELETE'])
 def clear_shopping_list():
     """Clear entire shopping list"""
-    shopping_list = data_manager.load_shopping_list()
+    shopping_list = get_data_manager().load_shopping_list()
     shopping_list.clear_list()
-    data_manager.save_shopping_list(shopping_list)
+    get_data_manager().save_shopping_list(shopping_list)
     return jsonify({'message': 'Shopping list cleared'})
 
 @shopping_bp.route('/shopping-list/summary', methods=['GET'])
 def get_shopping_list_summary():
     """Get shopping list summary with statistics"""
-    shopping_list = data_manager.load_shopping_list()
-    items = shopping_list.items
-    
-    summary = {
-        'total_items': len(items),
-        'total_quantity': sum(item.quantity for item in items),
-        'estimated_total': sum(item.price * item.quantity for item in items),
-        'categories': {},
-        'organic_count': len([item for item in items if item.is_organic])
-    }
-    
-    # Count by category
-    for item in items:
-        if item.category not in summary['categories']:
-            summary['categories'][item.category] = 0
-        summary['categories'][item.category] += item.quantity
-    
-    return jsonify(summary)
\ No newline at end of file
+    shopping_list = get_data_manager().load_shopping_list()
+    return jsonify(shopping_list.get_summary())
\ No newline at end of file
@@ -1,5 +1,6 @@
 from flask import jsonify
 from datetime import datetime
+from functools import wraps
 
 def serialize_datetime(obj):
     """JSON serializer for datetime objects"""
@@ -7,6 +8,16 @@ def serialize_datetime(obj):
         return obj.isoformat()
     raise TypeError(f"Object {obj} is not JSON serializable")
 
+def api_endpoint(view):
+    """Return {'success': False, 'error': ...} with a 500 when the view raises"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            return view(*args, **kwargs)
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+    return wrapper
+
 def register_error_handlers(app):
     """Register error handlers for the Flask app"""
     
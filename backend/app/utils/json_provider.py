@@ -0,0 +1,26 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes responses and parses request bodies with orjson"""
+    
+    # Dates keep Flask's HTTP-date format by falling through to the default hook
+    option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def register_json_provider(app):
+    """Use orjson for the Flask app's JSON when it is installed"""
+    if orjson is None:
+        return False
+    
+    app.json = ORJSONProvider(app)
+    return True
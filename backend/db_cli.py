@@ -98,6 +98,7 @@ def main():
 def show_database_status():
     """Show database status information"""
     try:
+        from sqlalchemy import func, select
         from src.database import SessionLocal
         from src.database.models import User, Category, Item, ShoppingList, Purchase
         
@@ -106,12 +107,14 @@ def show_database_status():
         
         db = SessionLocal()
         
-        # Count records
-        user_count = db.query(User).count()
-        category_count = db.query(Category).count()
-        item_count = db.query(Item).count()
-        shopping_list_count = db.query(ShoppingList).count()
-        purchase_count = db.query(Purchase).count()
+        # Count records in a single round trip
+        def count_of(model):
+            return select(func.count()).select_from(model).scalar_subquery()
+        
+        user_count, category_count, item_count, shopping_list_count, purchase_count = db.execute(
+            select(count_of(User), count_of(Category), count_of(Item),
+                   count_of(ShoppingList), count_of(Purchase))
+        ).one()
         
         print("📊 Database Status:")
         print(f"  Users: {user_count}")
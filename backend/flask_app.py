@@ -17,7 +17,6 @@ def create_app():
     
     # Configuration
     app.config['DEBUG'] = os.getenv('FLASK_DEBUG', 'true').lower() == 'true'
-    app.config['JSON_SORT_KEYS'] = False
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     
     # Database configuration
@@ -34,6 +33,14 @@ def create_app():
             print(f"⚠️  Database initialization warning: {e}")
             print("   You can run 'python setup_database.py' to set up the database")
     
+    # Fast JSON encoding and parsing
+    try:
+        from app.utils.json_provider import register_json_provider
+        if not register_json_provider(app):
+            print("Warning: orjson not installed, using the standard JSON provider")
+    except ImportError as e:
+        print(f"Warning: Could not load JSON provider: {e}")
+    
     # Error handlers
     try:
         from app.utils.error_handlers import register_error_handlers
@@ -87,4 +94,4 @@ def create_app():
 
 if __name__ == '__main__':
     app = create_app()
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=app.config['DEBUG'])
\ No newline at end of file
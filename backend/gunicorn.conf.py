@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration for running the backend in production
+Used by run.py when FLASK_ENV=production, or directly:
+    gunicorn -c gunicorn.conf.py "flask_app:create_app()"
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('API_PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Load the app once in the master so workers share it copy-on-write
+preload_app = True
+
+def on_starting(server):
+    """Build the lazily created engines in the master before workers fork"""
+    from app.routes.recipe import get_engine
+    from app.routes.shopping_list import get_data_manager
+    from app.routes.store import get_store_engine
+    get_engine()
+    get_data_manager()
+    get_store_engine().warm_caches()
@@ -130,7 +130,7 @@ class SmartGroceryAssistant:
         print(f"   • Total quantity: {self.shopping_list.total_quantity}")
         
         # Show health score if items exist
-        health_rating = self.recommendation_engine.rate_shopping_list_healthiness(self.shopping_list)
+        health_rating = self.recommendation_engine.rate_shopping_list_healthiness(self.shopping_list, include_breakdown=False)
         print(f"   • Health score: {health_rating['overall_score']}/10 (Grade: {health_rating['health_grade']})")
     
     def add_item_to_list(self):
@@ -365,7 +365,7 @@ class SmartGroceryAssistant:
             print("🎉 Great! Your shopping list already consists of healthy choices.")
             
             # Show current health rating
-            health_rating = self.recommendation_engine.rate_shopping_list_healthiness(self.shopping_list)
+            health_rating = self.recommendation_engine.rate_shopping_list_healthiness(self.shopping_list, include_breakdown=False)
             print(f"\n📊 Health Analysis:")
             print(f"   • Overall Score: {health_rating['overall_score']}/10")
             print(f"   • Health Grade: {health_rating['health_grade']}")
@@ -706,7 +706,7 @@ class SmartGroceryAssistant:
         
         # Health stats
         if self.shopping_list.items:
-            health_rating = self.recommendation_engine.rate_shopping_list_healthiness(self.shopping_list)
+            health_rating = self.recommendation_engine.rate_shopping_list_healthiness(self.shopping_list, include_breakdown=False)
             print(f"\n🏥 Health Score: {health_rating['overall_score']}/10")
         
         # Expiration stats
@@ -14,8 +14,23 @@ sys.path.insert(0, current_dir)
 # Import create_app from flask_app.py
 from flask_app import create_app
 
+def run_production_server():
+    """Replace this process with gunicorn using gunicorn.conf.py"""
+    print("🚀 Starting Smart Grocery Assistant Backend Server (production)...")
+    config_path = os.path.join(current_dir, 'gunicorn.conf.py')
+    os.chdir(current_dir)
+    
+    try:
+        os.execvp('gunicorn', ['gunicorn', '-c', config_path, 'flask_app:create_app()'])
+    except FileNotFoundError:
+        print("❌ gunicorn is not installed. Run: pip install gunicorn")
+        return 1
+
 def main():
     """Main entry point for the backend server"""
+    if os.getenv('FLASK_ENV', 'development').lower() == 'production':
+        return run_production_server()
+    
     print("🚀 Starting Smart Grocery Assistant Backend Server...")
     print("📍 API will be available at: http://localhost:5000")
     print("🌐 CORS enabled for frontend development")
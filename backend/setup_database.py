@@ -3,15 +3,118 @@ Database setup and initialization script
 """
 import os
 import sys
+from sqlalchemy import UniqueConstraint, bindparam, delete, inspect, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import OperationalError, ProgrammingError
 
 # Add the parent directory to the path so we can import our modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.database import init_db, drop_db, SessionLocal
+from src.database import Base, init_db, engine
 from src.database.models import Category, User, Item, Store
 from src.utils.database_data_manager import DatabaseDataManager
 
+# Seed rows, built once at import and passed straight to Core inserts
+DEFAULT_USER_ROW = {
+    "id": 1,
+    "name": "Default User",
+    "email": "user@smartgrocery.local",
+    "preferences": {
+        'expiration_reminder_days': 3,
+        'suggestion_count': 10,
+        'prefer_organic': False,
+        'dietary_restrictions': [],
+        'favorite_categories': [],
+        'notifications_enabled': True
+    }
+}
+
+CATEGORY_ROWS = (
+    {"name": "fruits", "color": "#4CAF50", "icon": "apple", "description": "Fresh fruits and berries"},
+    {"name": "vegetables", "color": "#8BC34A", "icon": "carrot", "description": "Fresh vegetables and greens"},
+    {"name": "dairy", "color": "#2196F3", "icon": "milk", "description": "Milk, cheese, yogurt and dairy products"},
+    {"name": "protein", "color": "#FF5722", "icon": "meat", "description": "Meat, fish, eggs and protein sources"},
+    {"name": "grains", "color": "#FF9800", "icon": "bread", "description": "Bread, rice, pasta and grain products"},
+    {"name": "pantry", "color": "#795548", "icon": "storage", "description": "Canned goods, spices and pantry staples"},
+    {"name": "beverages", "color": "#00BCD4", "icon": "drink", "description": "Drinks, juices and beverages"},
+    {"name": "snacks", "color": "#9C27B0", "icon": "cookie", "description": "Snacks, sweets and treats"},
+    {"name": "frozen", "color": "#607D8B", "icon": "frozen", "description": "Frozen foods and ice cream"},
+    {"name": "bakery", "color": "#FFC107", "icon": "cake", "description": "Fresh bread, pastries and baked goods"}
+)
+
+ITEM_ROWS = (
+    # Fruits
+    {"name": "apples", "category_id": 1, "average_price": 3.99, "default_unit": "kg", "expiration_days": 14},
+    {"name": "bananas", "category_id": 1, "average_price": 2.49, "default_unit": "kg", "expiration_days": 7},
+    {"name": "oranges", "category_id": 1, "average_price": 4.99, "default_unit": "kg", "expiration_days": 10},
+
+    # Vegetables
+    {"name": "carrots", "category_id": 2, "average_price": 2.99, "default_unit": "kg", "expiration_days": 21},
+    {"name": "broccoli", "category_id": 2, "average_price": 3.49, "default_unit": "piece", "expiration_days": 7},
+    {"name": "tomatoes", "category_id": 2, "average_price": 5.99, "default_unit": "kg", "expiration_days": 5},
+
+    # Dairy
+    {"name": "milk", "category_id": 3, "average_price": 3.99, "default_unit": "liter", "expiration_days": 7},
+    {"name": "cheese", "category_id": 3, "average_price": 8.99, "default_unit": "package", "expiration_days": 30},
+    {"name": "yogurt", "category_id": 3, "average_price": 1.99, "default_unit": "cup", "expiration_days": 14},
+
+    # Protein
+    {"name": "chicken breast", "category_id": 4, "average_price": 12.99, "default_unit": "kg", "expiration_days": 3},
+    {"name": "eggs", "category_id": 4, "average_price": 4.99, "default_unit": "dozen", "expiration_days": 21},
+    {"name": "salmon", "category_id": 4, "average_price": 19.99, "default_unit": "kg", "expiration_days": 2},
+
+    # Grains
+    {"name": "bread", "category_id": 5, "average_price": 2.99, "default_unit": "loaf", "expiration_days": 7},
+    {"name": "rice", "category_id": 5, "average_price": 4.99, "default_unit": "kg", "expiration_days": 365},
+    {"name": "pasta", "category_id": 5, "average_price": 1.99, "default_unit": "package", "expiration_days": 730},
+
+    # Pantry
+    {"name": "olive oil", "category_id": 6, "average_price": 8.99, "default_unit": "bottle", "expiration_days": 730},
+    {"name": "salt", "category_id": 6, "average_price": 0.99, "default_unit": "package", "expiration_days": 1095},
+    {"name": "black pepper", "category_id": 6, "average_price": 3.99, "default_unit": "package", "expiration_days": 365}
+)
+
+STORE_ROWS = (
+    {
+        "name": "SuperMarket Plus",
+        "address": "123 Main Street, Colombo",
+        "latitude": 6.9271,
+        "longitude": 79.8612,
+        "phone": "+94 11 123 4567",
+        "store_type": "supermarket",
+        "rating": 4.5,
+        "is_active": True
+    },
+    {
+        "name": "Fresh Foods Market",
+        "address": "456 Galle Road, Colombo",
+        "latitude": 6.9147,
+        "longitude": 79.8730,
+        "phone": "+94 11 234 5678",
+        "store_type": "grocery",
+        "rating": 4.2,
+        "is_active": True
+    },
+    {
+        "name": "Organic Corner",
+        "address": "789 Kandy Road, Colombo",
+        "latitude": 6.9344,
+        "longitude": 79.8428,
+        "phone": "+94 11 345 6789",
+        "store_type": "organic",
+        "rating": 4.7,
+        "is_active": True
+    }
+)
+
+# Seed batches in foreign-key order: items point at categories
+SEED_BATCHES = (
+    (User.__table__, (DEFAULT_USER_ROW,)),
+    (Category.__table__, CATEGORY_ROWS),
+    (Item.__table__, ITEM_ROWS),
+    (Store.__table__, STORE_ROWS)
+)
+
 def create_database():
     """Create database tables"""
     try:
@@ -23,130 +126,83 @@ def create_database():
         print(f"❌ Error creating database tables: {e}")
         return False
 
+# Dialects with INSERT ... ON CONFLICT DO NOTHING, which makes re-running the seed skip existing rows
+_CONFLICT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+def _insert_rows(batches, conn=None):
+    """Insert each (table, rows) batch in order, in a new transaction unless conn is given"""
+    if conn is None:
+        with engine.begin() as conn:
+            return _insert_rows(batches, conn)
+    
+    conflict_insert = _CONFLICT_INSERTS.get(conn.dialect.name)
+    for table, rows in batches:
+        stmt = conflict_insert(table).on_conflict_do_nothing() if conflict_insert else table.insert()
+        conn.execute(stmt, rows)
+
+# Unique keys that ON CONFLICT DO NOTHING relies on to skip rows that are already seeded
+SEED_UNIQUE_KEYS = tuple(
+    constraint
+    for table in (Item.__table__, Store.__table__)
+    for constraint in table.constraints
+    if isinstance(constraint, UniqueConstraint) and constraint.name
+)
+
+def _ensure_unique_keys(conn):
+    """
+    Add SEED_UNIQUE_KEYS to tables created before they existed: merge duplicate rows
+    into the oldest one, repointing foreign keys, then create a unique index
+    """
+    inspector = inspect(conn)
+    for constraint in SEED_UNIQUE_KEYS:
+        table = constraint.table
+        key_columns = [column.name for column in constraint.columns]
+        existing = [uc['column_names'] for uc in inspector.get_unique_constraints(table.name)]
+        existing += [ix['column_names'] for ix in inspector.get_indexes(table.name) if ix['unique']]
+        if key_columns in existing:
+            continue
+        
+        # Oldest row per key survives; NULLs never collide under a unique constraint
+        keep, duplicates = {}, []
+        for row in conn.execute(select(table.c.id, *constraint.columns).order_by(table.c.id)):
+            key = tuple(row[1:])
+            if None in key:
+                continue
+            if key in keep:
+                duplicates.append({'duplicate_id': row.id, 'keep_id': keep[key]})
+            else:
+                keep[key] = row.id
+        
+        if duplicates:
+            for other in Base.metadata.sorted_tables:
+                for fk in other.foreign_keys:
+                    if fk.column is table.c.id:
+                        conn.execute(
+                            update(other).where(fk.parent == bindparam('duplicate_id'))
+                            .values({fk.parent.name: bindparam('keep_id')}),
+                            duplicates
+                        )
+            conn.execute(delete(table).where(table.c.id.in_([d['duplicate_id'] for d in duplicates])))
+            print(f"  ✅ Merged {len(duplicates)} duplicate {table.name} rows")
+        
+        conn.execute(text(f"CREATE UNIQUE INDEX {constraint.name} ON {table.name} ({', '.join(key_columns)})"))
+        print(f"  ✅ Added unique key {constraint.name}")
+
 def seed_database():
     """Seed database with initial data"""
     try:
         print("🌱 Seeding database with initial data...")
         
-        db = SessionLocal()
-        
-        # Create default user
-        user = User(
-            id=1,
-            name="Default User",
-            email="user@smartgrocery.local",
-            preferences={
-                'expiration_reminder_days': 3,
-                'suggestion_count': 10,
-                'prefer_organic': False,
-                'dietary_restrictions': [],
-                'favorite_categories': [],
-                'notifications_enabled': True
-            }
-        )
-        db.add(user)
-        
-        # Create categories
-        categories = [
-            Category(name="fruits", color="#4CAF50", icon="apple", description="Fresh fruits and berries"),
-            Category(name="vegetables", color="#8BC34A", icon="carrot", description="Fresh vegetables and greens"),
-            Category(name="dairy", color="#2196F3", icon="milk", description="Milk, cheese, yogurt and dairy products"),
-            Category(name="protein", color="#FF5722", icon="meat", description="Meat, fish, eggs and protein sources"),
-            Category(name="grains", color="#FF9800", icon="bread", description="Bread, rice, pasta and grain products"),
-            Category(name="pantry", color="#795548", icon="storage", description="Canned goods, spices and pantry staples"),
-            Category(name="beverages", color="#00BCD4", icon="drink", description="Drinks, juices and beverages"),
-            Category(name="snacks", color="#9C27B0", icon="cookie", description="Snacks, sweets and treats"),
-            Category(name="frozen", color="#607D8B", icon="frozen", description="Frozen foods and ice cream"),
-            Category(name="bakery", color="#FFC107", icon="cake", description="Fresh bread, pastries and baked goods")
-        ]
-        
-        for category in categories:
-            db.add(category)
-        
-        # Create sample items
-        sample_items = [
-            # Fruits
-            Item(name="apples", category_id=1, average_price=3.99, default_unit="kg", expiration_days=14),
-            Item(name="bananas", category_id=1, average_price=2.49, default_unit="kg", expiration_days=7),
-            Item(name="oranges", category_id=1, average_price=4.99, default_unit="kg", expiration_days=10),
-            
-            # Vegetables
-            Item(name="carrots", category_id=2, average_price=2.99, default_unit="kg", expiration_days=21),
-            Item(name="broccoli", category_id=2, average_price=3.49, default_unit="piece", expiration_days=7),
-            Item(name="tomatoes", category_id=2, average_price=5.99, default_unit="kg", expiration_days=5),
-            
-            # Dairy
-            Item(name="milk", category_id=3, average_price=3.99, default_unit="liter", expiration_days=7),
-            Item(name="cheese", category_id=3, average_price=8.99, default_unit="package", expiration_days=30),
-            Item(name="yogurt", category_id=3, average_price=1.99, default_unit="cup", expiration_days=14),
-            
-            # Protein
-            Item(name="chicken breast", category_id=4, average_price=12.99, default_unit="kg", expiration_days=3),
-            Item(name="eggs", category_id=4, average_price=4.99, default_unit="dozen", expiration_days=21),
-            Item(name="salmon", category_id=4, average_price=19.99, default_unit="kg", expiration_days=2),
-            
-            # Grains
-            Item(name="bread", category_id=5, average_price=2.99, default_unit="loaf", expiration_days=7),
-            Item(name="rice", category_id=5, average_price=4.99, default_unit="kg", expiration_days=365),
-            Item(name="pasta", category_id=5, average_price=1.99, default_unit="package", expiration_days=730),
-            
-            # Pantry
-            Item(name="olive oil", category_id=6, average_price=8.99, default_unit="bottle", expiration_days=730),
-            Item(name="salt", category_id=6, average_price=0.99, default_unit="package", expiration_days=1095),
-            Item(name="black pepper", category_id=6, average_price=3.99, default_unit="package", expiration_days=365)
-        ]
-        
-        for item in sample_items:
-            db.add(item)
-        
-        # Create sample stores
-        sample_stores = [
-            Store(
-                name="SuperMarket Plus",
-                address="123 Main Street, Colombo",
-                latitude=6.9271,
-                longitude=79.8612,
-                phone="+94 11 123 4567",
-                store_type="supermarket",
-                rating=4.5,
-                is_active=True
-            ),
-            Store(
-                name="Fresh Foods Market",
-                address="456 Galle Road, Colombo",
-                latitude=6.9147,
-                longitude=79.8730,
-                phone="+94 11 234 5678",
-                store_type="grocery",
-                rating=4.2,
-                is_active=True
-            ),
-            Store(
-                name="Organic Corner",
-                address="789 Kandy Road, Colombo",
-                latitude=6.9344,
-                longitude=79.8428,
-                phone="+94 11 345 6789",
-                store_type="organic",
-                rating=4.7,
-                is_active=True
-            )
-        ]
-        
-        for store in sample_stores:
-            db.add(store)
-        
-        db.commit()
-        db.close()
+        # One transaction, so a failure leaves no partial seed behind
+        with engine.begin() as conn:
+            _ensure_unique_keys(conn)
+            _insert_rows(SEED_BATCHES, conn)
         
         print("✅ Database seeded successfully")
         return True
         
     except Exception as e:
         print(f"❌ Error seeding database: {e}")
-        if 'db' in locals():
-            db.rollback()
-            db.close()
         return False
 
 def migrate_json_data():
@@ -159,26 +215,16 @@ def migrate_json_data():
         db_dm = DatabaseDataManager(use_database=True)
         
         # Migrate shopping list
-        shopping_list = json_dm.load_shopping_list()
-        if hasattr(shopping_list, 'to_dict'):
-            shopping_list_data = shopping_list.to_dict()
-        else:
-            shopping_list_data = shopping_list
-            
-        if shopping_list_data.get('items'):
+        shopping_list_data = json_dm.load_shopping_list_data()
+        if shopping_list_data['items']:
             db_dm.save_shopping_list(shopping_list_data)
             print(f"  ✅ Migrated {len(shopping_list_data['items'])} shopping list items")
         
-        # Migrate purchase history
-        purchase_history = json_dm.load_purchase_history()
-        if hasattr(purchase_history, 'to_dict'):
-            purchase_history_data = purchase_history.to_dict()
-        else:
-            purchase_history_data = purchase_history
-            
-        if purchase_history_data.get('purchases'):
-            db_dm.save_purchase_history(purchase_history_data)
-            print(f"  ✅ Migrated {len(purchase_history_data['purchases'])} purchase records")
+        # Migrate purchase history, streamed from the JSON file straight into batched inserts.
+        # Replacing the user's rows keeps a re-run from duplicating the history
+        migrated = db_dm.bulk_save_purchases(json_dm.load_purchase_history_stream(), replace=True)
+        if migrated:
+            print(f"  ✅ Migrated {migrated} purchase records")
         
         # Migrate user preferences
         preferences = json_dm.load_user_preferences()
@@ -197,15 +243,18 @@ def reset_database():
     """Reset database (drop and recreate)"""
     try:
         print("🔄 Resetting database...")
-        drop_db()
-        print("  ✅ Dropped existing tables")
         
-        if create_database() and seed_database():
-            print("✅ Database reset completed successfully")
-            return True
-        else:
-            print("❌ Database reset failed")
-            return False
+        # Drop, recreate and seed on one connection in a single transaction
+        with engine.begin() as conn:
+            Base.metadata.drop_all(bind=conn)
+            print("  ✅ Dropped existing tables")
+            Base.metadata.create_all(bind=conn)
+            print("  ✅ Created database tables")
+            _insert_rows(SEED_BATCHES, conn)
+            print("  ✅ Seeded initial data")
+        
+        print("✅ Database reset completed successfully")
+        return True
     except Exception as e:
         print(f"❌ Error resetting database: {e}")
         return False
@@ -214,10 +263,9 @@ def check_database_connection():
     """Check if database connection is working"""
     try:
         print("🔍 Checking database connection...")
-        from sqlalchemy import text
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
+        # A pooled Core connection is enough for the probe, no ORM Session needed
+        with engine.connect() as conn:
+            conn.scalar(text("SELECT 1"))
         print("✅ Database connection successful")
         return True
     except Exception as e:
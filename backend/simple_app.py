@@ -1,21 +1,28 @@
 #!/usr/bin/env python3
 """
 Simplified Flask Application for Smart Grocery Assistant
+In production run it under gunicorn:
+    gunicorn -w 4 -k gthread "simple_app:create_app()"
 """
 
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
+import hashlib
 import os
 import sys
 
+from app.utils.json_provider import register_json_provider
+
 def create_app():
     """Create and configure Flask application"""
     app = Flask(__name__)
     CORS(app)
     
     # Basic configuration
-    app.config['DEBUG'] = True
-    app.config['JSON_SORT_KEYS'] = False
+    app.config['DEBUG'] = os.getenv('FLASK_ENV', 'development').lower() != 'production'
+    
+    # jsonify encodes with orjson when it is installed
+    register_json_provider(app)
     
     # Basic health check endpoint
     @app.route('/')
@@ -37,35 +44,60 @@ def create_app():
             }
         })
     
+    # The recommendations payload is static, so it is encoded and hashed once
+    recommendations_body = app.json.response({
+        'success': True,
+        'data': {
+            'recommendations': [
+                {
+                    'item': 'Milk',
+                    'category': 'dairy',
+                    'reason': 'You often buy milk on weekends',
+                    'confidence': 0.85
+                },
+                {
+                    'item': 'Bread',
+                    'category': 'bakery', 
+                    'reason': 'Goes well with your shopping pattern',
+                    'confidence': 0.78
+                }
+            ]
+        }
+    }).get_data()
+    recommendations_etag = hashlib.blake2b(recommendations_body, digest_size=8).hexdigest()
+    
     # Simple recommendations endpoint for testing
     @app.route('/api/recommendations')
     def get_recommendations():
-        return jsonify({
-            'success': True,
-            'data': {
-                'recommendations': [
-                    {
-                        'item': 'Milk',
-                        'category': 'dairy',
-                        'reason': 'You often buy milk on weekends',
-                        'confidence': 0.85
-                    },
-                    {
-                        'item': 'Bread',
-                        'category': 'bakery', 
-                        'reason': 'Goes well with your shopping pattern',
-                        'confidence': 0.78
-                    }
-                ]
-            }
-        })
+        response = Response(recommendations_body, mimetype='application/json')
+        response.set_etag(recommendations_etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = 60
+        return response.make_conditional(request)
     
     return app
 
+def run_production_server():
+    """Replace this process with gunicorn serving the simplified app"""
+    print("🚀 Starting Smart Grocery Assistant API Server (production)...")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    
+    try:
+        os.execvp('gunicorn', [
+            'gunicorn', '-w', os.getenv('WEB_CONCURRENCY', '4'), '-k', 'gthread',
+            '-b', f"0.0.0.0:{os.getenv('API_PORT', '5000')}", 'simple_app:create_app()'
+        ])
+    except FileNotFoundError:
+        print("❌ gunicorn is not installed. Run: pip install gunicorn")
+        return 1
+
 if __name__ == '__main__':
+    if os.getenv('FLASK_ENV', 'development').lower() == 'production':
+        sys.exit(run_production_server())
+    
     app = create_app()
     print("🚀 Starting Smart Grocery Assistant API Server...")
     print("📍 API available at: http://localhost:5000")
     print("🔍 Health check: http://localhost:5000/")
     print("📋 Recommendations: http://localhost:5000/api/recommendations")
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=app.config['DEBUG'])
\ No newline at end of file
@@ -1,7 +1,8 @@
 """
 Database configuration and setup for Smart Grocery Assistant
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -28,16 +29,34 @@ if 'sqlite' in DATABASE_URL:
         poolclass=StaticPool,
         connect_args={'check_same_thread': False}
     )
+    
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL journal, relaxed fsync and a 64 MB page cache on every new SQLite connection"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA cache_size=-65536')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.close()
 else:
+    engine_options = {}
+    if make_url(DATABASE_URL).get_dialect().driver == 'psycopg2':
+        # Let psycopg2 send multi-row INSERTs as paged VALUES lists and batch other executemany calls
+        engine_options['executemany_mode'] = 'values_plus_batch'
+    
     engine = create_engine(
         DATABASE_URL,
         pool_size=10,
         max_overflow=20,
-        pool_pre_ping=True
+        pool_pre_ping=True,
+        insertmanyvalues_page_size=10000,
+        **engine_options
     )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factory. Objects keep their loaded state after commit instead of being
+# expired and re-SELECTed on next access; call db.refresh(obj) where fresh data is needed
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
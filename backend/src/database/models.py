@@ -1,20 +1,33 @@
 """
 SQLAlchemy models for Smart Grocery Assistant
 """
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import (
+    Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON, Index, text,
+    Enum, UniqueConstraint
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from src.database.config import Base
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+# Binary, indexable JSONB on PostgreSQL, plain JSON everywhere else
+JSONType = JSON().with_variant(JSONB(), 'postgresql')
+
+# Allowed values for the enumerated string columns; native ENUM types on PostgreSQL,
+# CHECK constraints elsewhere
+PRIORITIES = ('low', 'medium', 'high')
+NOTIFICATION_PRIORITIES = ('low', 'medium', 'high', 'urgent')
+MEAL_TYPES = ('breakfast', 'lunch', 'dinner', 'snack')
+
 class User(Base):
     __tablename__ = 'users'
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     email = Column(String(255), unique=True, index=True)
-    preferences = Column(JSON, default={})
+    preferences = Column(JSONType, default=dict, server_default=text("'{}'"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -38,12 +51,13 @@ class Category(Base):
 
 class Item(Base):
     __tablename__ = 'items'
+    __table_args__ = (UniqueConstraint('name', 'category_id', name='uq_item_name_category'),)
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, index=True)
     category_id = Column(Integer, ForeignKey('categories.id'), nullable=False)
     barcode = Column(String(50), unique=True, index=True)
-    nutrition = Column(JSON, default={})  # Nutritional information
+    nutrition = Column(JSONType, default=dict, server_default=text("'{}'"))  # Nutritional information
     average_price = Column(Float, default=0.0)
     default_unit = Column(String(20), default='piece')
     expiration_days = Column(Integer, default=7)
@@ -83,7 +97,7 @@ class ShoppingListItem(Base):
     estimated_price = Column(Float, default=0.0)
     is_purchased = Column(Boolean, default=False)
     notes = Column(Text)
-    priority = Column(String(10), default='medium')  # low, medium, high
+    priority = Column(Enum(*PRIORITIES, name='priority_enum', create_constraint=True), default='medium')
     added_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -113,6 +127,7 @@ class Purchase(Base):
 
 class Store(Base):
     __tablename__ = 'stores'
+    __table_args__ = (UniqueConstraint('name', 'address', name='uq_store_name_address'),)
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
@@ -152,15 +167,15 @@ class Recipe(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False, index=True)
     description = Column(Text)
-    ingredients = Column(JSON, nullable=False)  # List of ingredients with quantities
-    instructions = Column(JSON, nullable=False)  # List of instruction steps
+    ingredients = Column(JSONType, nullable=False)  # List of ingredients with quantities
+    instructions = Column(JSONType, nullable=False)  # List of instruction steps
     prep_time = Column(Integer, default=0)  # Minutes
     cook_time = Column(Integer, default=0)  # Minutes
     servings = Column(Integer, default=1)
     difficulty = Column(String(20), default='medium')  # easy, medium, hard
     cuisine_type = Column(String(50))
-    dietary_tags = Column(JSON, default=[])  # vegetarian, vegan, gluten-free, etc.
-    nutrition = Column(JSON, default={})
+    dietary_tags = Column(JSONType, default=list, server_default=text("'[]'"))  # vegetarian, vegan, gluten-free, etc.
+    nutrition = Column(JSONType, default=dict, server_default=text("'{}'"))
     rating = Column(Float, default=0.0)
     image_url = Column(String(255))
     created_by = Column(Integer, ForeignKey('users.id'))
@@ -195,7 +210,7 @@ class MealPlanItem(Base):
     meal_plan_id = Column(Integer, ForeignKey('meal_plans.id'), nullable=False)
     recipe_id = Column(Integer, ForeignKey('recipes.id'), nullable=False)
     meal_date = Column(DateTime(timezone=True), nullable=False)
-    meal_type = Column(String(20), nullable=False)  # breakfast, lunch, dinner, snack
+    meal_type = Column(Enum(*MEAL_TYPES, name='meal_type_enum', create_constraint=True), nullable=False)
     servings = Column(Integer, default=1)
     
     # Relationships
@@ -211,9 +226,12 @@ class Notification(Base):
     message = Column(Text, nullable=False)
     notification_type = Column(String(50), nullable=False)  # expiration, budget, deal, etc.
     is_read = Column(Boolean, default=False)
-    priority = Column(String(10), default='medium')  # low, medium, high
+    priority = Column(
+        Enum(*NOTIFICATION_PRIORITIES, name='notification_priority_enum', create_constraint=True),
+        default='medium'
+    )
     action_url = Column(String(255))
-    notification_metadata = Column(JSON, default={})
+    notification_metadata = Column(JSONType, default=dict, server_default=text("'{}'"))
     expires_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -237,4 +255,21 @@ class BudgetGoal(Base):
     
     # Relationships
     user = relationship("User")
-    category = relationship("Category")
\ No newline at end of file
+    category = relationship("Category")
+
+# Composite indexes for the common lookups: a user's purchases by date, an item's
+# prices across stores and the items on a shopping list
+Index('ix_purchase_user_date', Purchase.user_id, Purchase.purchase_date.desc())
+Index('ix_storeprice_item_store', StorePrice.item_id, StorePrice.store_id)
+Index('ix_sli_list_item', ShoppingListItem.shopping_list_id, ShoppingListItem.item_id)
+
+# Queries only ever look up a user's active shopping list; the predicate matches their
+# `is_active == True` filter so the planner can prove the partial index applies
+Index(
+    'ix_sl_active', ShoppingList.user_id,
+    postgresql_where=ShoppingList.is_active == True,
+    sqlite_where=ShoppingList.is_active == True
+)
+
+# GIN index for containment (@>) lookups on preferences, PostgreSQL only
+Index('ix_user_prefs_gin', User.preferences, postgresql_using='gin').ddl_if(dialect='postgresql')
\ No newline at end of file
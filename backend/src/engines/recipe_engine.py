@@ -3,13 +3,47 @@ Smart Recipe Integration Engine
 Provides recipe recommendations, meal planning, and cooking optimization
 """
 
+import sys
 import json
 import math
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple, Optional
-from dataclasses import dataclass
+import hashlib
+import heapq
+import bisect
+import functools
+import operator
+import re
+import numpy as np
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Any, Iterable, Tuple, Optional, FrozenSet, ClassVar, Mapping
+from dataclasses import dataclass, field
+from ..utils.substring_index import SubstringIndex
 
-@dataclass
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Word runs used to index searchable recipe text
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Fixed nutrient order for the per-recipe nutrition vectors
+NUTRIENTS = ("calories", "protein", "carbs", "fat", "fiber")
+
+@dataclass(slots=True)
+class Nutrition:
+    """Per-serving nutrition facts"""
+    calories: float
+    protein: float
+    carbs: float
+    fat: float
+    fiber: float
+    
+    def to_dict(self) -> Dict[str, float]:
+        """Nutrient name to value, in NUTRIENTS order"""
+        return {nutrient: getattr(self, nutrient) for nutrient in NUTRIENTS}
+
+@dataclass(slots=True)
 class Recipe:
     """Recipe data structure"""
     id: str
@@ -23,11 +57,69 @@ class Recipe:
     difficulty: str  # "easy", "medium", "hard"
     cuisine_type: str  # "italian", "asian", "american", etc.
     dietary_tags: List[str]  # ["vegetarian", "vegan", "gluten-free", etc.]
-    nutrition: Dict[str, float]  # calories, protein, carbs, fat, etc.
+    nutrition: Nutrition
     rating: float
     image_url: str
+    # Serialized views, built on first use and shared by every response
+    _base_dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _summary_dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _etag: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    # Interned lowercase ingredient names in ingredient order, and split once
+    # at load time for the matchers
+    ingredients_lc: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    required_lc: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    optional_lc: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    all_lc: FrozenSet[str] = field(default=frozenset(), init=False, repr=False, compare=False)
+    tags_set: FrozenSet[str] = field(default=frozenset(), init=False, repr=False, compare=False)
+    # Row of the owning engine's nutrition matrix, in NUTRIENTS order
+    _nutr_vec: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.ingredients_lc = tuple(sys.intern(ing["item"].lower()) for ing in self.ingredients)
+        self.required_lc = tuple(item for ing, item in zip(self.ingredients, self.ingredients_lc) if not ing["optional"])
+        self.optional_lc = tuple(item for ing, item in zip(self.ingredients, self.ingredients_lc) if ing["optional"])
+        self.all_lc = frozenset(self.required_lc + self.optional_lc)
+        self.tags_set = frozenset(self.dietary_tags)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Full recipe representation for API responses (cached)"""
+        if self._base_dict is None:
+            self._base_dict = {
+                'id': self.id,
+                'name': self.name,
+                'description': self.description,
+                'ingredients': self.ingredients,
+                'instructions': self.instructions,
+                'prep_time': self.prep_time,
+                'cook_time': self.cook_time,
+                'servings': self.servings,
+                'difficulty': self.difficulty,
+                'cuisine_type': self.cuisine_type,
+                'dietary_tags': self.dietary_tags,
+                'nutrition': self.nutrition.to_dict(),
+                'rating': self.rating,
+                'image_url': self.image_url
+            }
+        return self._base_dict
+    
+    def to_summary_dict(self) -> Dict[str, Any]:
+        """Recipe representation without ingredients and instructions (cached)"""
+        if self._summary_dict is None:
+            self._summary_dict = {
+                key: value for key, value in self.to_dict().items()
+                if key not in ('ingredients', 'instructions')
+            }
+        return self._summary_dict
+    
+    @property
+    def etag(self) -> str:
+        """Content hash of the recipe, used as its HTTP ETag"""
+        if self._etag is None:
+            payload = json.dumps(self.to_dict(), sort_keys=True).encode('utf-8')
+            self._etag = hashlib.blake2b(payload, digest_size=8).hexdigest()
+        return self._etag
 
-@dataclass
+@dataclass(slots=True)
 class MealPlan:
     """Meal plan data structure"""
     date: str
@@ -38,14 +130,255 @@ class MealPlan:
     total_nutrition: Dict[str, float]
     estimated_cost: float
 
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first; ties keep catalog order"""
+    if k < len(scores):
+        kth = np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(-scores <= kth)
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')][:k]
+
+def _schedule_kernel(prep: np.ndarray, cook: np.ndarray) -> np.ndarray:
+    """
+    Prep start times for recipes cooked in the given order. Each recipe's prep
+    starts at least 5 minutes after the previous one's, and no later than the
+    moment the previous recipe goes on to cook.
+    """
+    start = np.zeros(len(prep), dtype=np.int64)
+    for i in range(len(prep) - 1):
+        prep_end = start[i] + prep[i]
+        start[i + 1] = min(max(start[i] + 5, prep_end - prep[i + 1]), prep_end)
+    return start
+
+if njit is not None:
+    # The recurrence is serial, so it is compiled rather than vectorized
+    _schedule_kernel = njit(cache=True)(_schedule_kernel)
+
+def _count_ingredient_matches(term_counts: Counter, ingredients: FrozenSet[str]) -> int:
+    """Count terms, with multiplicity, that appear in any ingredient name"""
+    # Whole-name hits come from one set intersection; only the rest need substring tests
+    exact = term_counts.keys() & ingredients
+    matches = sum(term_counts[term] for term in exact)
+    for term, count in term_counts.items():
+        if term not in exact and any(term in ing for ing in ingredients):
+            matches += count
+    return matches
+
+# Percent-of-daily-value bounds between the nutrition statuses (each bound starts the next status)
+_STATUS_BOUNDS = (10, 20, 40, 60)
+_STATUS_NAMES = ("low", "moderate", "good", "high", "very_high")
+
+# Ingredient keywords behind the recipe health benefits
+_VEGGIE_SET = frozenset({"tomato", "carrot", "spinach", "broccoli", "bell pepper"})
+_HEALTHY_FAT_SET = frozenset({"olive oil", "avocado", "salmon", "nuts"})
+
+def _keyword_pattern(keywords: Iterable[str]) -> "re.Pattern[str]":
+    """Regex matching any of the keywords as a substring"""
+    return re.compile("|".join(map(re.escape, sorted(keywords))))
+
+_VEGGIE_RE = _keyword_pattern(_VEGGIE_SET)
+_HEALTHY_FAT_RE = _keyword_pattern(_HEALTHY_FAT_SET)
+
+def _mentions_any(keywords: FrozenSet[str], pattern: "re.Pattern[str]", recipe: Recipe) -> bool:
+    """Whether any keyword (also compiled into pattern) appears in one of the recipe's ingredient names"""
+    # Ingredients named exactly after a keyword are a hash lookup away
+    if not keywords.isdisjoint(recipe.all_lc):
+        return True
+    # Otherwise one scan per ingredient covers every keyword
+    return any(pattern.search(item_lc) for item_lc in recipe.ingredients_lc)
+
+def _freeze_preferences(preferences: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Hashable, order-independent signature of a preference dict"""
+    return tuple(sorted(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in preferences.items()
+    ))
+
 class RecipeEngine:
     """Advanced recipe recommendation and meal planning engine"""
     
+    # Common ingredient substitutions database
+    SUBSTITUTIONS: ClassVar[Mapping[str, Tuple[str, ...]]] = {
+        "butter": ("olive oil", "coconut oil", "margarine"),
+        "milk": ("almond milk", "soy milk", "coconut milk"),
+        "eggs": ("flax eggs", "applesauce", "banana"),
+        "flour": ("almond flour", "coconut flour", "oat flour"),
+        "sugar": ("honey", "maple syrup", "stevia"),
+        "cream": ("coconut cream", "cashew cream", "milk + butter"),
+        "chicken": ("tofu", "tempeh", "mushrooms"),
+        "beef": ("lentils", "mushrooms", "tempeh"),
+        "cheese": ("nutritional yeast", "cashew cheese", "vegan cheese"),
+        "sour cream": ("greek yogurt", "cashew cream", "coconut cream")
+    }
+    
+    # Calorie window a recipe must fall in to be planned for each meal
+    MEAL_CALORIE_RANGES: ClassVar[Mapping[str, Tuple[int, int]]] = {
+        "breakfast": (200, 400),
+        "lunch": (300, 600),
+        "dinner": (400, 800)
+    }
+    
+    # Simplified per-unit ingredient costs, checked in order
+    BASE_COSTS: ClassVar[Mapping[str, float]] = {
+        "meat": 8.0, "chicken": 6.0, "beef": 10.0, "salmon": 12.0,
+        "vegetables": 2.0, "fruits": 3.0, "dairy": 4.0,
+        "grains": 1.5, "spices": 0.5, "oil": 2.0
+    }
+    COMMON_FOODS: ClassVar[Tuple[str, ...]] = (
+        "chicken", "beef", "salmon", "tomato", "carrot", "onion",
+        "rice", "pasta", "cheese", "milk", "oil"
+    )
+    
+    # Upper bound on remembered available-ingredient lookups before the cache is reset
+    MATCH_CACHE_SIZE = 4096
+    
     def __init__(self):
         self.recipes = self._load_sample_recipes()
+        self._recipe_by_id = {recipe.id: recipe for recipe in self.recipes}
         self.user_preferences = self._load_user_preferences()
         self.dietary_restrictions = self._load_dietary_restrictions()
         self.nutrition_targets = self._load_nutrition_targets()
+        self._catalog_etag = None
+        self._build_ingredient_index()
+        self._build_recipe_columns()
+        self._build_search_index()
+        # Recommendations depend only on (preferences, restrictions) for a fixed catalog
+        self._recommend_cached = functools.lru_cache(maxsize=128)(self._score_recommendations)
+        self._meal_buckets = self._meal_buckets_for(self.recipes)
+        self._meal_candidates = functools.lru_cache(maxsize=32)(self._filter_meal_candidates)
+    
+    def get_recipe(self, recipe_id: str) -> Optional[Recipe]:
+        """Look up a recipe by id, or None if it does not exist"""
+        return self._recipe_by_id.get(recipe_id)
+    
+    @property
+    def catalog_etag(self) -> str:
+        """ETag covering the whole recipe set, derived from each recipe's ETag"""
+        if self._catalog_etag is None:
+            digest = hashlib.blake2b(digest_size=8)
+            for recipe in self.recipes:
+                digest.update(recipe.etag.encode('ascii'))
+            self._catalog_etag = digest.hexdigest()
+        return self._catalog_etag
+    
+    def _build_ingredient_index(self):
+        """
+        Flatten recipe ingredients into CSR-style arrays for vectorized matching.
+        Recipe i owns entries offsets[i]:offsets[i+1] of the flat arrays, required
+        ingredients first; each entry points into a vocabulary of unique
+        lowercased ingredient names.
+        """
+        vocabulary: Dict[str, int] = {}
+        ingredient_ids = []
+        owners = []
+        optional = []
+        offsets = [0]
+        
+        for recipe_idx, recipe in enumerate(self.recipes):
+            for is_optional, names in ((False, recipe.required_lc), (True, recipe.optional_lc)):
+                for name in names:
+                    ingredient_ids.append(vocabulary.setdefault(name, len(vocabulary)))
+                    owners.append(recipe_idx)
+                    optional.append(is_optional)
+            offsets.append(len(ingredient_ids))
+        
+        self._ingredient_vocab = list(vocabulary)
+        self._vocab_search = SubstringIndex(self._ingredient_vocab)
+        self._available_matches: Dict[str, np.ndarray] = {}
+        
+        self._ingredient_ids = np.array(ingredient_ids, dtype=np.int32)
+        self._ingredient_owner = np.array(owners, dtype=np.int32)
+        self._ingredient_optional = np.array(optional, dtype=bool)
+        self._ingredient_offsets = np.array(offsets, dtype=np.int32)
+        
+        n_recipes = len(self.recipes)
+        self._required_counts = np.bincount(self._ingredient_owner[~self._ingredient_optional], minlength=n_recipes)
+        self._optional_counts = np.bincount(self._ingredient_owner[self._ingredient_optional], minlength=n_recipes)
+    
+    def _build_recipe_columns(self):
+        """
+        Struct-of-arrays view of the catalog's numeric and categorical fields for
+        vectorized scoring. Categorical fields are stored as integer codes, and each
+        recipe's nutrition vector becomes a row view into one contiguous matrix.
+        """
+        self._category_codes = {
+            "cuisine": {name: code for code, name in enumerate(dict.fromkeys(r.cuisine_type for r in self.recipes))},
+            "difficulty": {name: code for code, name in enumerate(dict.fromkeys(r.difficulty for r in self.recipes))}
+        }
+        
+        # Integer catalogs keep an integer matrix so summed totals stay ints
+        values = [getattr(r.nutrition, nutrient) for r in self.recipes for nutrient in NUTRIENTS]
+        dtype = np.int64 if all(isinstance(value, int) for value in values) else np.float64
+        nutrition = np.array(values, dtype=dtype).reshape(len(self.recipes), len(NUTRIENTS))
+        for recipe, row in zip(self.recipes, nutrition):
+            recipe._nutr_vec = row
+        
+        self._columns = {
+            "prep": np.array([r.prep_time for r in self.recipes], dtype=np.int32),
+            "cook": np.array([r.cook_time for r in self.recipes], dtype=np.int32),
+            "servings": np.array([r.servings for r in self.recipes], dtype=np.int32),
+            "rating": np.array([r.rating for r in self.recipes], dtype=np.float64),
+            "cuisine": np.array([self._category_codes["cuisine"][r.cuisine_type] for r in self.recipes], dtype=np.int16),
+            "difficulty": np.array([self._category_codes["difficulty"][r.difficulty] for r in self.recipes], dtype=np.int16),
+            "nutrition": nutrition
+        }
+    
+    def _build_search_index(self):
+        """Lowercased searchable text of each recipe, parallel to self.recipes"""
+        self._search_index: List[Tuple[str, str, Tuple[str, ...], str, Tuple[str, ...]]] = [
+            (
+                recipe.name.lower(),
+                recipe.description.lower(),
+                recipe.ingredients_lc,
+                recipe.cuisine_type.lower(),
+                tuple(tag.lower() for tag in recipe.dietary_tags)
+            )
+            for recipe in self.recipes
+        ]
+        
+        # Inverted index from each word of the searchable text to the recipes using it
+        postings: Dict[str, set] = {}
+        for recipe_idx, (name_lc, desc_lc, ingredients_lc, cuisine_lc, tags_lc) in enumerate(self._search_index):
+            for text in (name_lc, desc_lc, cuisine_lc, *ingredients_lc, *tags_lc):
+                for token in _TOKEN_RE.findall(text):
+                    postings.setdefault(token, set()).add(recipe_idx)
+        self._search_postings = postings
+        self._search_candidates_cache: Dict[str, List[int]] = {}
+    
+    def _search_candidates(self, query_lower: str) -> Optional[List[int]]:
+        """
+        Indices of recipes that can match a lowercased query, in catalog order, or
+        None when the query has no word characters and every recipe must be scanned.
+        The query's longest word run must sit inside a single word of any text
+        containing the query, so only recipes with such a word are candidates.
+        """
+        words = _TOKEN_RE.findall(query_lower)
+        if not words:
+            return None
+        
+        key = max(words, key=len)
+        candidates = self._search_candidates_cache.get(key)
+        if candidates is None:
+            hits = set()
+            for token, recipe_ids in self._search_postings.items():
+                if key in token:
+                    hits.update(recipe_ids)
+            candidates = sorted(hits)
+            if len(self._search_candidates_cache) >= self.MATCH_CACHE_SIZE:
+                self._search_candidates_cache.clear()
+            self._search_candidates_cache[key] = candidates
+        return candidates
+    
+    def _match_available(self, available: str) -> np.ndarray:
+        """Vocabulary ids whose names contain, or are contained in, an available ingredient (cached)"""
+        matches = self._available_matches.get(available)
+        if matches is None:
+            matches = np.array(sorted(self._vocab_search.matches(available)), dtype=np.int32)
+            if len(self._available_matches) >= self.MATCH_CACHE_SIZE:
+                self._available_matches.clear()
+            self._available_matches[available] = matches
+        return matches
     
     def _load_sample_recipes(self) -> List[Recipe]:
         """Load sample recipe database"""
@@ -78,7 +411,7 @@ class RecipeEngine:
                 difficulty="easy",
                 cuisine_type="italian",
                 dietary_tags=["vegetarian"],
-                nutrition={"calories": 420, "protein": 12, "carbs": 65, "fat": 14, "fiber": 5},
+                nutrition=Nutrition(calories=420, protein=12, carbs=65, fat=14, fiber=5),
                 rating=4.3,
                 image_url="/images/pasta-primavera.jpg"
             ),
@@ -111,7 +444,7 @@ class RecipeEngine:
                 difficulty="easy",
                 cuisine_type="asian",
                 dietary_tags=["high-protein", "gluten-free"],
-                nutrition={"calories": 280, "protein": 35, "carbs": 12, "fat": 8, "fiber": 4},
+                nutrition=Nutrition(calories=280, protein=35, carbs=12, fat=8, fiber=4),
                 rating=4.5,
                 image_url="/images/chicken-stir-fry.jpg"
             ),
@@ -142,7 +475,7 @@ class RecipeEngine:
                 difficulty="easy",
                 cuisine_type="mediterranean",
                 dietary_tags=["vegan", "gluten-free", "high-protein"],
-                nutrition={"calories": 520, "protein": 18, "carbs": 68, "fat": 22, "fiber": 12},
+                nutrition=Nutrition(calories=520, protein=18, carbs=68, fat=22, fiber=12),
                 rating=4.7,
                 image_url="/images/quinoa-buddha-bowl.jpg"
             ),
@@ -175,7 +508,7 @@ class RecipeEngine:
                 difficulty="medium",
                 cuisine_type="indian",
                 dietary_tags=["high-protein", "gluten-free"],
-                nutrition={"calories": 385, "protein": 28, "carbs": 15, "fat": 25, "fiber": 3},
+                nutrition=Nutrition(calories=385, protein=28, carbs=15, fat=25, fiber=3),
                 rating=4.4,
                 image_url="/images/beef-curry.jpg"
             ),
@@ -207,7 +540,7 @@ class RecipeEngine:
                 difficulty="easy",
                 cuisine_type="greek",
                 dietary_tags=["vegetarian", "low-carb", "gluten-free"],
-                nutrition={"calories": 220, "protein": 8, "carbs": 12, "fat": 18, "fiber": 4},
+                nutrition=Nutrition(calories=220, protein=8, carbs=12, fat=18, fiber=4),
                 rating=4.6,
                 image_url="/images/greek-salad.jpg"
             ),
@@ -239,7 +572,7 @@ class RecipeEngine:
                 difficulty="medium",
                 cuisine_type="mediterranean",
                 dietary_tags=["high-protein", "keto", "gluten-free"],
-                nutrition={"calories": 320, "protein": 42, "carbs": 4, "fat": 15, "fiber": 2},
+                nutrition=Nutrition(calories=320, protein=42, carbs=4, fat=15, fiber=2),
                 rating=4.8,
                 image_url="/images/salmon-lemon-herbs.jpg"
             )
@@ -287,182 +620,214 @@ class RecipeEngine:
         # Normalize ingredient names for better matching
         available_lower = [ing.lower().strip() for ing in available_ingredients]
         
-        for recipe in self.recipes:
-            # Calculate ingredient match score
-            required_ingredients = [ing["item"].lower() for ing in recipe.ingredients if not ing["optional"]]
-            optional_ingredients = [ing["item"].lower() for ing in recipe.ingredients if ing["optional"]]
-            
-            # Count matches for required ingredients
-            required_matches = sum(1 for req_ing in required_ingredients 
-                                 if any(req_ing in avail_ing or avail_ing in req_ing 
-                                       for avail_ing in available_lower))
-            
-            # Count matches for optional ingredients
-            optional_matches = sum(1 for opt_ing in optional_ingredients 
-                                 if any(opt_ing in avail_ing or avail_ing in opt_ing 
-                                       for avail_ing in available_lower))
-            
-            # Calculate match percentage
-            total_required = len(required_ingredients)
-            if total_required == 0:
-                continue
-                
-            match_score = required_matches / total_required
-            bonus_score = optional_matches / max(len(optional_ingredients), 1) * 0.2
-            
-            final_score = min(match_score + bonus_score, 1.0)
-            
-            if final_score >= match_threshold:
-                missing_ingredients = [ing["item"] for ing in recipe.ingredients 
-                                     if not ing["optional"] and 
-                                     not any(ing["item"].lower() in avail_ing or avail_ing in ing["item"].lower() 
-                                            for avail_ing in available_lower)]
-                
-                recipe_matches.append({
-                    "recipe": recipe,
-                    "match_score": final_score,
-                    "missing_ingredients": missing_ingredients,
-                    "missing_count": len(missing_ingredients)
-                })
+        # Resolve each available ingredient to the vocabulary entries it matches
+        # (remembered across queries), then scatter to every recipe using them
+        vocab_hit = np.zeros(len(self._ingredient_vocab), dtype=bool)
+        for avail_ing in set(available_lower):
+            vocab_hit[self._match_available(avail_ing)] = True
+        hits = vocab_hit[self._ingredient_ids]
+        
+        n_recipes = len(self.recipes)
+        required_matches = np.bincount(self._ingredient_owner, weights=hits & ~self._ingredient_optional, minlength=n_recipes)
+        
+        # Calculate match percentage; recipes without required ingredients are skipped
+        match_score = required_matches / np.maximum(self._required_counts, 1)
         
-        # Sort by match score (descending) and missing ingredient count (ascending)
-        recipe_matches.sort(key=lambda x: (-x["match_score"], x["missing_count"]))
+        # Prune recipes that miss the threshold even with the full optional bonus
+        max_bonus = np.where(self._optional_counts > 0, 0.2, 0.0)
+        reachable = (self._required_counts > 0) & (match_score + max_bonus >= match_threshold)
+        if not reachable.any():
+            return []
+        
+        optional_hits = hits & self._ingredient_optional & reachable[self._ingredient_owner]
+        optional_matches = np.bincount(self._ingredient_owner, weights=optional_hits, minlength=n_recipes)
+        bonus_score = optional_matches / np.maximum(self._optional_counts, 1) * 0.2
+        final_scores = np.minimum(match_score + bonus_score, 1.0)
+        
+        candidates = np.flatnonzero(reachable & (final_scores >= match_threshold))
+        
+        for recipe_idx in candidates:
+            recipe = self.recipes[recipe_idx]
+            start = self._ingredient_offsets[recipe_idx]
+            required_hits = hits[start:start + len(recipe.required_lc)]
+            required = (ing["item"] for ing in recipe.ingredients if not ing["optional"])
+            missing_ingredients = [item for item, hit in zip(required, required_hits) if not hit]
+            
+            recipe_matches.append({
+                "recipe": recipe,
+                "match_score": float(final_scores[recipe_idx]),
+                "missing_ingredients": missing_ingredients,
+                "missing_count": len(missing_ingredients)
+            })
         
-        return recipe_matches[:10]  # Return top 10 matches
+        # Top 10 by match score (descending) and missing ingredient count (ascending)
+        return heapq.nlargest(10, recipe_matches, key=lambda x: (x["match_score"], -x["missing_count"]))
     
     def get_recipe_recommendations(self, preferences: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Get personalized recipe recommendations"""
         if preferences is None:
             preferences = self.user_preferences
         
-        scored_recipes = []
+        user_restrictions = tuple(self.dietary_restrictions)
+        pref_key = _freeze_preferences(preferences)
+        try:
+            hash(pref_key)
+        except TypeError:
+            # Nested dicts and other unhashable values are scored without the cache
+            recommendations = self._top_recommendations(self._score_matrix([preferences], user_restrictions), 0, 15)
+        else:
+            recommendations = self._recommend_cached(pref_key, user_restrictions)
         
-        for recipe in self.recipes:
-            score = 0.0
-            factors = {}
-            
-            # Cuisine preference scoring (25%)
-            if recipe.cuisine_type in preferences.get("preferred_cuisines", []):
-                cuisine_score = 1.0
-            else:
-                cuisine_score = 0.3
-            score += cuisine_score * 0.25
-            factors["cuisine"] = cuisine_score
-            
-            # Time preference scoring (20%)
-            max_prep = preferences.get("max_prep_time", 60)
-            max_cook = preferences.get("max_cook_time", 120)
-            
-            time_score = 1.0
-            if recipe.prep_time > max_prep:
-                time_score *= 0.5
-            if recipe.cook_time > max_cook:
-                time_score *= 0.5
-            
-            score += time_score * 0.20
-            factors["time"] = time_score
-            
-            # Difficulty preference scoring (15%)
-            if recipe.difficulty in preferences.get("preferred_difficulty", ["easy", "medium"]):
-                difficulty_score = 1.0
-            else:
-                difficulty_score = 0.4
-            score += difficulty_score * 0.15
-            factors["difficulty"] = difficulty_score
-            
-            # Ingredient preference scoring (25%)
+        # Cached entries are shared between calls, so callers get their own copies
+        return [
+            {**recommendation, "score_factors": dict(recommendation["score_factors"])}
+            for recommendation in recommendations
+        ]
+    
+    def score_all(self, preferences_batch: List[Optional[Dict[str, Any]]], top_k: int = 15) -> List[List[Dict[str, Any]]]:
+        """Recommendations for many users at once; None entries use the default preferences"""
+        batch = [self.user_preferences if preferences is None else preferences for preferences in preferences_batch]
+        if not batch:
+            return []
+        
+        scores = self._score_matrix(batch, tuple(self.dietary_restrictions))
+        return [list(self._top_recommendations(scores, user_idx, top_k)) for user_idx in range(len(batch))]
+    
+    def _score_recommendations(self, pref_key: Tuple[Tuple[str, Any], ...],
+                               user_restrictions: Tuple[str, ...]) -> Tuple[Dict[str, Any], ...]:
+        """Score every recipe for a frozen preference signature and keep the top 15"""
+        scores = self._score_matrix([dict(pref_key)], user_restrictions)
+        return self._top_recommendations(scores, 0, 15)
+    
+    def _category_indicator(self, column: str, values_per_user: List[List[str]]) -> np.ndarray:
+        """(users x recipes) mask of recipes whose categorical column is among each user's values"""
+        codes = self._category_codes[column]
+        wanted = np.zeros((len(values_per_user), len(codes)), dtype=bool)
+        for user_idx, values in enumerate(values_per_user):
+            wanted[user_idx, [codes[value] for value in values if value in codes]] = True
+        return wanted[:, self._columns[column]]
+    
+    def _score_matrix(self, preferences_batch: List[Dict[str, Any]],
+                      user_restrictions: Tuple[str, ...]) -> Dict[str, np.ndarray]:
+        """Recommendation subscores and total score as (users x recipes) arrays"""
+        columns = self._columns
+        n_users, n_recipes = len(preferences_batch), len(self.recipes)
+        
+        # Cuisine preference scoring (25%)
+        cuisine_score = np.where(self._category_indicator(
+            "cuisine", [preferences.get("preferred_cuisines", []) for preferences in preferences_batch]
+        ), 1.0, 0.3)
+        
+        # Time preference scoring (20%)
+        max_prep = np.array([preferences.get("max_prep_time", 60) for preferences in preferences_batch])
+        max_cook = np.array([preferences.get("max_cook_time", 120) for preferences in preferences_batch])
+        
+        time_score = np.ones((n_users, n_recipes))
+        time_score[columns["prep"] > max_prep[:, None]] *= 0.5
+        time_score[columns["cook"] > max_cook[:, None]] *= 0.5
+        
+        # Difficulty preference scoring (15%)
+        difficulty_score = np.where(self._category_indicator(
+            "difficulty", [preferences.get("preferred_difficulty", ["easy", "medium"]) for preferences in preferences_batch]
+        ), 1.0, 0.4)
+        
+        # Ingredient preference scoring (25%)
+        ingredient_score = np.empty((n_users, n_recipes))
+        for user_idx, preferences in enumerate(preferences_batch):
             favorite_ingredients = preferences.get("favorite_ingredients", [])
             disliked_ingredients = preferences.get("disliked_ingredients", [])
             
-            recipe_ingredients = [ing["item"].lower() for ing in recipe.ingredients]
-            
-            # Boost for favorite ingredients
-            favorite_matches = sum(1 for fav in favorite_ingredients 
-                                 if any(fav.lower() in ing for ing in recipe_ingredients))
-            favorite_score = min(favorite_matches / max(len(favorite_ingredients), 1), 1.0)
-            
-            # Penalty for disliked ingredients
-            disliked_matches = sum(1 for dis in disliked_ingredients 
-                                 if any(dis.lower() in ing for ing in recipe_ingredients))
-            dislike_penalty = disliked_matches * 0.3
-            
-            ingredient_score = max(favorite_score - dislike_penalty, 0.0)
-            score += ingredient_score * 0.25
-            factors["ingredients"] = ingredient_score
-            
-            # Recipe rating scoring (15%)
-            rating_score = recipe.rating / 5.0
-            score += rating_score * 0.15
-            factors["rating"] = rating_score
+            favorite_counts = Counter(fav.lower() for fav in favorite_ingredients)
+            disliked_counts = Counter(dis.lower() for dis in disliked_ingredients)
             
-            # Check dietary restrictions
-            dietary_compatible = True
-            user_restrictions = self.dietary_restrictions
-            
-            for restriction in user_restrictions:
-                if restriction not in recipe.dietary_tags:
-                    dietary_compatible = False
-                    break
-            
-            if not dietary_compatible:
-                score *= 0.1  # Heavy penalty for dietary restriction violations
-            
-            scored_recipes.append({
-                "recipe": recipe,
-                "recommendation_score": score,
-                "score_factors": factors,
-                "dietary_compatible": dietary_compatible
-            })
+            for recipe_idx, recipe in enumerate(self.recipes):
+                # Boost for favorite ingredients
+                favorite_matches = _count_ingredient_matches(favorite_counts, recipe.all_lc)
+                favorite_score = min(favorite_matches / max(len(favorite_ingredients), 1), 1.0)
+                
+                # Penalty for disliked ingredients
+                disliked_matches = _count_ingredient_matches(disliked_counts, recipe.all_lc)
+                dislike_penalty = disliked_matches * 0.3
+                
+                ingredient_score[user_idx, recipe_idx] = max(favorite_score - dislike_penalty, 0.0)
+        
+        # Recipe rating scoring (15%)
+        rating_score = np.broadcast_to(columns["rating"] / 5.0, (n_users, n_recipes))
+        
+        score = cuisine_score * 0.25 + time_score * 0.20 + difficulty_score * 0.15 + ingredient_score * 0.25 + rating_score * 0.15
         
-        # Sort by recommendation score
-        scored_recipes.sort(key=lambda x: x["recommendation_score"], reverse=True)
+        # Check dietary restrictions
+        user_restriction_set = frozenset(user_restrictions)
+        dietary_compatible = np.fromiter(
+            (user_restriction_set.issubset(recipe.tags_set) for recipe in self.recipes),
+            dtype=bool, count=n_recipes
+        )
+        score[:, ~dietary_compatible] *= 0.1  # Heavy penalty for dietary restriction violations
         
-        return scored_recipes[:15]  # Return top 15 recommendations
+        return {
+            "score": score,
+            "cuisine": cuisine_score,
+            "time": time_score,
+            "difficulty": difficulty_score,
+            "ingredients": ingredient_score,
+            "rating": rating_score,
+            "dietary_compatible": dietary_compatible
+        }
+    
+    def _top_recommendations(self, scores: Dict[str, np.ndarray], user_idx: int, top_k: int) -> Tuple[Dict[str, Any], ...]:
+        """Result entries for one user's top_k recipes, best first"""
+        return tuple(
+            {
+                "recipe": self.recipes[recipe_idx],
+                "recommendation_score": float(scores["score"][user_idx, recipe_idx]),
+                "score_factors": {
+                    factor: float(scores[factor][user_idx, recipe_idx])
+                    for factor in ("cuisine", "time", "difficulty", "ingredients", "rating")
+                },
+                "dietary_compatible": bool(scores["dietary_compatible"][recipe_idx])
+            }
+            for recipe_idx in _top_k_indices(scores["score"][user_idx], top_k)
+        )
     
     def optimize_cooking_time(self, selected_recipes: List[str]) -> Dict[str, Any]:
         """Optimize cooking schedule for multiple recipes"""
-        recipes = [r for r in self.recipes if r.id in selected_recipes]
+        # Catalog order, so equal cook times keep a stable schedule; recipe ids are
+        # strings, so any other (possibly unhashable) entry can never match
+        selected_ids = {recipe_id for recipe_id in selected_recipes if isinstance(recipe_id, str)}
+        recipes = [r for r in self.recipes if r.id in selected_ids]
         
         if not recipes:
             return {"error": "No valid recipes provided"}
         
-        # Calculate total time and find overlaps
-        total_prep_time = sum(r.prep_time for r in recipes)
-        total_cook_time = sum(r.cook_time for r in recipes)
-        
         # Simple scheduling algorithm
         # Sort by cook time (longest first)
-        sorted_recipes = sorted(recipes, key=lambda x: x.cook_time, reverse=True)
+        cook = np.array([r.cook_time for r in recipes], dtype=np.int64)
+        order = np.argsort(-cook, kind='stable')
+        sorted_recipes = [recipes[i] for i in order]
+        prep = np.array([r.prep_time for r in recipes], dtype=np.int64)[order]
+        cook = cook[order]
         
-        schedule = []
-        current_time = 0
+        start_prep = _schedule_kernel(prep, cook)
+        start_cook = start_prep + prep
+        finish = start_cook + cook
         
-        for i, recipe in enumerate(sorted_recipes):
-            start_time = current_time
-            prep_end = start_time + recipe.prep_time
-            cook_end = prep_end + recipe.cook_time
-            
-            schedule.append({
+        schedule = [
+            {
                 "recipe_id": recipe.id,
                 "recipe_name": recipe.name,
                 "start_prep": start_time,
                 "start_cook": prep_end,
                 "finish_time": cook_end,
-                "duration": recipe.prep_time + recipe.cook_time
-            })
-            
-            # Start next recipe prep while current is cooking (if possible)
-            if i < len(sorted_recipes) - 1:
-                next_recipe = sorted_recipes[i + 1]
-                # Can start next prep if it finishes before current cook ends
-                earliest_next_start = max(current_time + 5, prep_end - next_recipe.prep_time)
-                current_time = min(earliest_next_start, prep_end)
-            else:
-                current_time = cook_end
+                "duration": duration
+            }
+            for recipe, start_time, prep_end, cook_end, duration in zip(
+                sorted_recipes, start_prep.tolist(), start_cook.tolist(), finish.tolist(), (prep + cook).tolist()
+            )
+        ]
         
         # Calculate time savings
-        sequential_time = total_prep_time + total_cook_time
-        optimized_time = max(item["finish_time"] for item in schedule)
+        sequential_time = int(prep.sum() + cook.sum())
+        optimized_time = int(finish.max())
         time_saved = sequential_time - optimized_time
         
         return {
@@ -473,26 +838,22 @@ class RecipeEngine:
             "efficiency": (time_saved / sequential_time) * 100 if sequential_time > 0 else 0
         }
     
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _substitutes_for(ingredient: str) -> Tuple[str, ...]:
+        """Substitutes for every base ingredient named in a lowercased ingredient (cached)"""
+        return tuple(
+            sub for base_ingredient, subs in RecipeEngine.SUBSTITUTIONS.items()
+            if base_ingredient in ingredient
+            for sub in subs
+        )
+    
     def suggest_ingredient_substitutions(self, recipe_id: str, unavailable_ingredients: List[str]) -> Dict[str, Any]:
         """Suggest ingredient substitutions"""
-        recipe = next((r for r in self.recipes if r.id == recipe_id), None)
+        recipe = self._recipe_by_id.get(recipe_id)
         if not recipe:
             return {"error": "Recipe not found"}
         
-        # Common ingredient substitutions database
-        substitutions = {
-            "butter": ["olive oil", "coconut oil", "margarine"],
-            "milk": ["almond milk", "soy milk", "coconut milk"],
-            "eggs": ["flax eggs", "applesauce", "banana"],
-            "flour": ["almond flour", "coconut flour", "oat flour"],
-            "sugar": ["honey", "maple syrup", "stevia"],
-            "cream": ["coconut cream", "cashew cream", "milk + butter"],
-            "chicken": ["tofu", "tempeh", "mushrooms"],
-            "beef": ["lentils", "mushrooms", "tempeh"],
-            "cheese": ["nutritional yeast", "cashew cheese", "vegan cheese"],
-            "sour cream": ["greek yogurt", "cashew cream", "coconut cream"]
-        }
-        
         suggestions = {}
         recipe_changes = []
         
@@ -501,22 +862,19 @@ class RecipeEngine:
             
             # Find matching ingredient in recipe
             recipe_ingredient = None
-            for ing in recipe.ingredients:
-                if unavailable_lower in ing["item"].lower() or ing["item"].lower() in unavailable_lower:
+            for ing, item_lc in zip(recipe.ingredients, recipe.ingredients_lc):
+                if unavailable_lower in item_lc or item_lc in unavailable_lower:
                     recipe_ingredient = ing
                     break
             
             if recipe_ingredient:
                 # Look for substitutions
-                possible_subs = []
-                for base_ingredient, subs in substitutions.items():
-                    if base_ingredient in unavailable_lower:
-                        possible_subs.extend(subs)
+                possible_subs = self._substitutes_for(unavailable_lower)
                 
                 if possible_subs:
                     suggestions[unavailable] = {
                         "original_ingredient": recipe_ingredient,
-                        "substitutions": possible_subs[:3],  # Top 3 suggestions
+                        "substitutions": list(possible_subs[:3]),  # Top 3 suggestions
                         "notes": f"Substitute {recipe_ingredient['amount']} {recipe_ingredient['unit']} of {recipe_ingredient['item']}"
                     }
                     
@@ -544,43 +902,38 @@ class RecipeEngine:
         meal_plan = []
         used_recipes = set()
         
-        # Filter recipes based on dietary preferences
-        available_recipes = []
-        for recipe in self.recipes:
-            if dietary_preferences:
-                if all(pref in recipe.dietary_tags for pref in dietary_preferences if pref):
-                    available_recipes.append(recipe)
-            else:
-                available_recipes.append(recipe)
-        
-        if not available_recipes:
-            available_recipes = self.recipes  # Fallback to all recipes
+        # Recipes matching the dietary preferences, bucketed by meal type
+        dietary_key = tuple(sorted({pref for pref in dietary_preferences if pref}))
+        available_recipes, meal_buckets = self._meal_candidates(dietary_key)
         
         # Get nutrition targets
         daily_targets = self.nutrition_targets["daily"]
         meal_ratios = self.nutrition_targets["meal"]
         
+        start_date = date.today()
+        
         for day in range(days):
-            date = (datetime.now() + timedelta(days=day)).strftime("%Y-%m-%d")
+            plan_date = (start_date + timedelta(days=day)).isoformat()
             
             # Select recipes for each meal
-            breakfast = self._select_meal_recipe(available_recipes, "breakfast", used_recipes, daily_targets, meal_ratios)
-            lunch = self._select_meal_recipe(available_recipes, "lunch", used_recipes, daily_targets, meal_ratios)
-            dinner = self._select_meal_recipe(available_recipes, "dinner", used_recipes, daily_targets, meal_ratios)
+            breakfast = self._select_meal_recipe(available_recipes, meal_buckets, "breakfast", used_recipes, daily_targets, meal_ratios)
+            lunch = self._select_meal_recipe(available_recipes, meal_buckets, "lunch", used_recipes, daily_targets, meal_ratios)
+            dinner = self._select_meal_recipe(available_recipes, meal_buckets, "dinner", used_recipes, daily_targets, meal_ratios)
             snack = None  # Could add snack recipes later
             
             # Calculate total nutrition
-            total_nutrition = {"calories": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0}
+            meals = [meal for meal in (breakfast, lunch, dinner) if meal]
+            nutrition_total = np.zeros(len(NUTRIENTS), dtype=self._columns["nutrition"].dtype)
             estimated_cost = 0.0
             
-            for meal in [breakfast, lunch, dinner]:
-                if meal:
-                    for nutrient in total_nutrition:
-                        total_nutrition[nutrient] += meal.nutrition.get(nutrient, 0)
-                    estimated_cost += self._estimate_recipe_cost(meal)
+            for meal in meals:
+                nutrition_total += meal._nutr_vec
+                estimated_cost += self._estimate_recipe_cost(meal)
+            
+            total_nutrition = dict(zip(NUTRIENTS, nutrition_total.tolist()))
             
             meal_plan.append(MealPlan(
-                date=date,
+                date=plan_date,
                 breakfast=breakfast,
                 lunch=lunch,
                 dinner=dinner,
@@ -591,151 +944,163 @@ class RecipeEngine:
         
         return meal_plan
     
-    def _select_meal_recipe(self, recipes: List[Recipe], meal_type: str, 
-                           used_recipes: set, daily_targets: Dict[str, float], 
+    def _meal_buckets_for(self, recipes: List[Recipe]) -> Dict[str, List[Tuple[float, int, Recipe]]]:
+        """
+        Group recipes by the meal types whose calorie range they fit. Each bucket
+        holds (calories, position, recipe) entries sorted by calories, where
+        position is the recipe's index in the given list.
+        """
+        return {
+            meal_type: sorted(
+                (r.nutrition.calories, position, r)
+                for position, r in enumerate(recipes)
+                if low <= r.nutrition.calories <= high
+            )
+            for meal_type, (low, high) in self.MEAL_CALORIE_RANGES.items()
+        }
+    
+    @staticmethod
+    def _nearest_unused(bucket: List[Tuple[float, int, Recipe]], target_calories: float,
+                        used_recipes: set) -> Optional[Recipe]:
+        """Unused recipe closest to the calorie target; ties go to the earlier position"""
+        split = bisect.bisect_left(bucket, (target_calories,))
+        best = None
+        
+        # Walk outwards on each side; distances only grow, so stop once past the best
+        for indices in (range(split - 1, -1, -1), range(split, len(bucket))):
+            for idx in indices:
+                calories, position, recipe = bucket[idx]
+                distance = abs(calories - target_calories)
+                if best is not None and distance > best[0]:
+                    break
+                if recipe.id not in used_recipes and (best is None or (distance, position) < best[:2]):
+                    best = (distance, position, recipe)
+        
+        return best[2] if best else None
+    
+    def _filter_meal_candidates(self, dietary_key: Tuple[str, ...]) -> Tuple[List[Recipe], Dict[str, list]]:
+        """Recipes satisfying every dietary preference, plus their meal buckets"""
+        if not dietary_key:
+            return self.recipes, self._meal_buckets
+        
+        available_recipes = [r for r in self.recipes if r.tags_set.issuperset(dietary_key)]
+        if not available_recipes:
+            return self.recipes, self._meal_buckets  # Fallback to all recipes
+        return available_recipes, self._meal_buckets_for(available_recipes)
+    
+    def _select_meal_recipe(self, recipes: List[Recipe], meal_buckets: Dict[str, list],
+                           meal_type: str, used_recipes: set, daily_targets: Dict[str, float], 
                            meal_ratios: Dict[str, float]) -> Optional[Recipe]:
         """Select appropriate recipe for meal type"""
         # Calculate target nutrition for this meal
         target_calories = daily_targets["calories"] * meal_ratios.get(meal_type, 0.33)
         
-        # Filter recipes by meal appropriateness
-        suitable_recipes = []
-        for recipe in recipes:
-            if recipe.id in used_recipes:
-                continue
-                
-            # Meal type suitability based on calories and characteristics
-            if meal_type == "breakfast":
-                if 200 <= recipe.nutrition.get("calories", 0) <= 400:
-                    suitable_recipes.append(recipe)
-            elif meal_type == "lunch":
-                if 300 <= recipe.nutrition.get("calories", 0) <= 600:
-                    suitable_recipes.append(recipe)
-            elif meal_type == "dinner":
-                if 400 <= recipe.nutrition.get("calories", 0) <= 800:
-                    suitable_recipes.append(recipe)
-        
-        if not suitable_recipes:
-            suitable_recipes = [r for r in recipes if r.id not in used_recipes]
-        
-        if not suitable_recipes:
-            return None
+        # Best match among recipes suited to this meal by calories
+        best_recipe = self._nearest_unused(meal_buckets.get(meal_type, []), target_calories, used_recipes)
         
-        # Select best match based on nutrition targets
-        best_recipe = min(suitable_recipes, 
-                         key=lambda r: abs(r.nutrition.get("calories", 0) - target_calories))
+        if best_recipe is None:
+            suitable_recipes = [r for r in recipes if r.id not in used_recipes]
+            
+            if not suitable_recipes:
+                return None
+            
+            best_recipe = min(suitable_recipes, 
+                             key=lambda r: abs(r.nutrition.calories - target_calories))
         
         used_recipes.add(best_recipe.id)
         return best_recipe
     
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _ingredient_cost(item_lower: str) -> float:
+        """Rough per-unit cost of a lowercased ingredient name (cached)"""
+        # A common food anywhere in the name matches the first category checked (meat)
+        if any(food in item_lower for food in RecipeEngine.COMMON_FOODS):
+            return RecipeEngine.BASE_COSTS["meat"]
+        return next((cost for category, cost in RecipeEngine.BASE_COSTS.items() if category in item_lower), 2.0)
+    
     def _estimate_recipe_cost(self, recipe: Recipe) -> float:
         """Estimate cost of recipe (simplified)"""
         # Simplified cost estimation based on ingredients
-        base_costs = {
-            "meat": 8.0, "chicken": 6.0, "beef": 10.0, "salmon": 12.0,
-            "vegetables": 2.0, "fruits": 3.0, "dairy": 4.0,
-            "grains": 1.5, "spices": 0.5, "oil": 2.0
-        }
-        
         total_cost = 0.0
-        for ingredient in recipe.ingredients:
-            # Simple categorization and cost estimation
-            item_lower = ingredient["item"].lower()
-            cost_per_unit = 2.0  # Default cost
-            
-            for category, cost in base_costs.items():
-                if category in item_lower or any(food in item_lower for food in [
-                    "chicken", "beef", "salmon", "tomato", "carrot", "onion",
-                    "rice", "pasta", "cheese", "milk", "oil"
-                ]):
-                    cost_per_unit = cost
-                    break
-            
-            total_cost += cost_per_unit * 0.5  # Rough portion cost
+        for item_lower in recipe.ingredients_lc:
+            total_cost += self._ingredient_cost(item_lower) * 0.5  # Rough portion cost
         
         return round(total_cost, 2)
     
-    def get_recipe_nutrition_analysis(self, recipe_id: str) -> Dict[str, Any]:
+    def get_recipe_nutrition_analysis(self, recipe_id: str, include_breakdown: bool = True) -> Dict[str, Any]:
         """Get detailed nutrition analysis for a recipe"""
-        recipe = next((r for r in self.recipes if r.id == recipe_id), None)
+        recipe = self._recipe_by_id.get(recipe_id)
         if not recipe:
             return {"error": "Recipe not found"}
         
-        nutrition = recipe.nutrition
-        daily_targets = self.nutrition_targets["daily"]
+        analysis = {
+            "recipe_id": recipe_id,
+            "recipe_name": recipe.name,
+        }
+        # The per-nutrient breakdown is only built when the caller wants it
+        if include_breakdown:
+            analysis["nutrition_analysis"] = self._full_nutrition_analysis(recipe.nutrition)
+        analysis["overall_nutrition_score"] = round(self._compute_overall_score(recipe.nutrition) * 100, 1)
+        analysis["health_benefits"] = self._get_health_benefits(recipe)
+        analysis["dietary_tags"] = recipe.dietary_tags
+        return analysis
+    
+    def _daily_percentage(self, nutrient: str, value: float) -> float:
+        """Percentage of the daily target a nutrient value covers"""
+        daily_target = self.nutrition_targets["daily"].get(nutrient, 0)
+        return (value / daily_target * 100) if daily_target > 0 else 0
+    
+    def _compute_overall_score(self, nutrition: Nutrition) -> float:
+        """Overall nutrition score in [0, 1] from protein, fiber, calories and fat"""
+        # Uses the rounded percentages shown in the breakdown
+        protein_score = min(round(self._daily_percentage("protein", nutrition.protein), 1) / 25, 1.0)
+        fiber_score = min(round(self._daily_percentage("fiber", nutrition.fiber), 1) / 25, 1.0)
+        
+        # Penalty for excessive calories or fat
+        cal_score = max(1.0 - (round(self._daily_percentage("calories", nutrition.calories), 1) - 25) / 50, 0.5)
+        fat_score = max(1.0 - (round(self._daily_percentage("fat", nutrition.fat), 1) - 30) / 40, 0.5)
         
-        # Calculate percentages of daily values
+        return (protein_score + fiber_score + cal_score + fat_score) / 4
+    
+    def _full_nutrition_analysis(self, nutrition: Nutrition) -> Dict[str, Dict[str, Any]]:
+        """Value, daily target, percentage and status for every nutrient"""
+        daily_targets = self.nutrition_targets["daily"]
         nutrition_analysis = {}
-        for nutrient, value in nutrition.items():
-            daily_target = daily_targets.get(nutrient, 0)
-            percentage = (value / daily_target * 100) if daily_target > 0 else 0
+        for nutrient in NUTRIENTS:
+            value = getattr(nutrition, nutrient)
+            percentage = self._daily_percentage(nutrient, value)
             
             nutrition_analysis[nutrient] = {
                 "value": value,
-                "daily_target": daily_target,
+                "daily_target": daily_targets.get(nutrient, 0),
                 "percentage_dv": round(percentage, 1),
                 "status": self._get_nutrition_status(percentage)
             }
-        
-        # Overall nutrition score
-        scores = []
-        for nutrient in ["protein", "fiber"]:
-            if nutrient in nutrition_analysis:
-                scores.append(min(nutrition_analysis[nutrient]["percentage_dv"] / 25, 1.0))
-        
-        # Penalty for excessive calories or fat
-        cal_score = max(1.0 - (nutrition_analysis.get("calories", {}).get("percentage_dv", 0) - 25) / 50, 0.5)
-        fat_score = max(1.0 - (nutrition_analysis.get("fat", {}).get("percentage_dv", 0) - 30) / 40, 0.5)
-        
-        scores.extend([cal_score, fat_score])
-        overall_score = sum(scores) / len(scores)
-        
-        return {
-            "recipe_id": recipe_id,
-            "recipe_name": recipe.name,
-            "nutrition_analysis": nutrition_analysis,
-            "overall_nutrition_score": round(overall_score * 100, 1),
-            "health_benefits": self._get_health_benefits(recipe),
-            "dietary_tags": recipe.dietary_tags
-        }
+        return nutrition_analysis
     
     def _get_nutrition_status(self, percentage: float) -> str:
         """Get nutrition status based on percentage of daily value"""
-        if percentage < 10:
-            return "low"
-        elif percentage < 20:
-            return "moderate"
-        elif percentage < 40:
-            return "good"
-        elif percentage < 60:
-            return "high"
-        else:
-            return "very_high"
+        return _STATUS_NAMES[bisect.bisect_right(_STATUS_BOUNDS, percentage)]
     
     def _get_health_benefits(self, recipe: Recipe) -> List[str]:
         """Get health benefits based on ingredients and nutrition"""
         benefits = []
         
         # Check for high protein
-        if recipe.nutrition.get("protein", 0) > 20:
+        if recipe.nutrition.protein > 20:
             benefits.append("High protein content supports muscle health")
         
         # Check for high fiber
-        if recipe.nutrition.get("fiber", 0) > 5:
+        if recipe.nutrition.fiber > 5:
             benefits.append("High fiber aids digestion and heart health")
         
         # Check for vegetables
-        veggie_ingredients = ["tomato", "carrot", "spinach", "broccoli", "bell pepper"]
-        if any(veggie in ingredient["item"].lower() 
-               for ingredient in recipe.ingredients 
-               for veggie in veggie_ingredients):
+        if _mentions_any(_VEGGIE_SET, _VEGGIE_RE, recipe):
             benefits.append("Rich in vitamins and antioxidants from vegetables")
         
         # Check for healthy fats
-        healthy_fats = ["olive oil", "avocado", "salmon", "nuts"]
-        if any(fat in ingredient["item"].lower() 
-               for ingredient in recipe.ingredients 
-               for fat in healthy_fats):
+        if _mentions_any(_HEALTHY_FAT_SET, _HEALTHY_FAT_RE, recipe):
             benefits.append("Contains healthy fats for heart health")
         
         return benefits
@@ -748,45 +1113,54 @@ class RecipeEngine:
         query_lower = query.lower()
         matching_recipes = []
         
-        for recipe in self.recipes:
+        max_prep = filters.get("max_prep_time")
+        max_cook = filters.get("max_cook_time")
+        difficulties = filters.get("difficulty")
+        cuisines = filters.get("cuisine_type")
+        required_tags = filters.get("dietary_tags")
+        
+        candidates = self._search_candidates(query_lower)
+        if candidates is None:
+            candidates = range(len(self.recipes))
+        
+        for recipe_idx in candidates:
+            recipe = self.recipes[recipe_idx]
+            name_lc, desc_lc, ingredients_lc, cuisine_lc, tags_lc = self._search_index[recipe_idx]
             score = 0.0
             
             # Name matching
-            if query_lower in recipe.name.lower():
+            if query_lower in name_lc:
                 score += 2.0
             
             # Description matching
-            if query_lower in recipe.description.lower():
+            if query_lower in desc_lc:
                 score += 1.0
             
             # Ingredient matching
-            for ingredient in recipe.ingredients:
-                if query_lower in ingredient["item"].lower():
+            for item_lc in ingredients_lc:
+                if query_lower in item_lc:
                     score += 1.5
             
             # Cuisine matching
-            if query_lower in recipe.cuisine_type.lower():
+            if query_lower in cuisine_lc:
                 score += 1.0
             
             # Dietary tag matching
-            for tag in recipe.dietary_tags:
-                if query_lower in tag.lower():
+            for tag_lc in tags_lc:
+                if query_lower in tag_lc:
                     score += 1.0
             
             # Apply filters
-            if filters:
-                if "max_prep_time" in filters and recipe.prep_time > filters["max_prep_time"]:
-                    score *= 0.5
-                if "max_cook_time" in filters and recipe.cook_time > filters["max_cook_time"]:
-                    score *= 0.5
-                if "difficulty" in filters and recipe.difficulty not in filters["difficulty"]:
-                    score *= 0.7
-                if "cuisine_type" in filters and recipe.cuisine_type not in filters["cuisine_type"]:
-                    score *= 0.6
-                if "dietary_tags" in filters:
-                    required_tags = filters["dietary_tags"]
-                    if not all(tag in recipe.dietary_tags for tag in required_tags):
-                        score *= 0.3
+            if max_prep is not None and recipe.prep_time > max_prep:
+                score *= 0.5
+            if max_cook is not None and recipe.cook_time > max_cook:
+                score *= 0.5
+            if difficulties is not None and recipe.difficulty not in difficulties:
+                score *= 0.7
+            if cuisines is not None and recipe.cuisine_type not in cuisines:
+                score *= 0.6
+            if required_tags is not None and not recipe.tags_set.issuperset(required_tags):
+                score *= 0.3
             
             if score > 0:
                 matching_recipes.append({
@@ -794,7 +1168,5 @@ class RecipeEngine:
                     "relevance_score": score
                 })
         
-        # Sort by relevance score
-        matching_recipes.sort(key=lambda x: x["relevance_score"], reverse=True)
-        
-        return matching_recipes[:20]  # Return top 20 matches
\ No newline at end of file
+        # Top 20 matches by relevance score
+        return heapq.nlargest(20, matching_recipes, key=operator.itemgetter("relevance_score"))
\ No newline at end of file
@@ -1,12 +1,51 @@
 from typing import List, Dict, Optional, Tuple
+import sys
 import json
+import re
+import bisect
+import functools
+import numpy as np
 from ..models.grocery_item import GroceryItem
+from ..utils.substring_index import SubstringIndex
+
+# Item healthiness rules: keyword bonuses/penalties and category floor scores
+HEALTHY_KEYWORDS = ('whole', 'organic', 'fresh', 'lean', 'low-fat', 'natural')
+UNHEALTHY_KEYWORDS = ('fried', 'processed', 'sugary', 'artificial', 'high-sodium')
+# Each keyword list compiled into one alternation, so a name is scanned once per list
+HEALTHY_KEYWORDS_RE = re.compile('|'.join(map(re.escape, HEALTHY_KEYWORDS)))
+UNHEALTHY_KEYWORDS_RE = re.compile('|'.join(map(re.escape, UNHEALTHY_KEYWORDS)))
+CATEGORY_SCORES = {
+    'fruits': 8,
+    'vegetables': 8,
+    'whole grains': 7,
+    'lean protein': 7,
+    'dairy': 5,
+    'snacks': 3,
+    'processed': 2,
+    'sweets': 2
+}
+
+# Keywords used to guess the category of a suggested item, in priority order
+CATEGORY_KEYWORDS = {
+    'fruits': ('fruit', 'berry', 'apple', 'banana', 'orange'),
+    'vegetables': ('vegetable', 'greens', 'carrot', 'broccoli', 'spinach'),
+    'protein': ('meat', 'fish', 'chicken', 'egg', 'bean', 'legume'),
+    'dairy': ('milk', 'cheese', 'yogurt'),
+    'grains': ('grain', 'rice', 'bread', 'pasta', 'oat')
+}
+
+# Minimum average score for each letter grade above F
+GRADE_BOUNDS = (5, 6, 7, 8)
+GRADE_LETTERS = ('F', 'D', 'C', 'B', 'A')
 
 class RecommendationEngine:
     """
     Recommendation engine for healthy alternatives and substitutions
     """
     
+    # Distinct item names whose alternative lookup is kept
+    ALTERNATIVE_CACHE_SIZE = 4096
+    
     def __init__(self):
         # Healthy alternatives database
         self.healthy_alternatives = {
@@ -155,65 +194,115 @@ class RecommendationEngine:
             'low_sodium': ['fresh foods', 'herbs', 'spices'],
             'antioxidants': ['berries', 'dark leafy greens', 'colorful vegetables']
         }
+        
+        # Single-word food sources per nutrient, checked against item name tokens
+        self._nutrition_priority_sets = {
+            nutrient: frozenset(source for source in sources if ' ' not in source)
+            for nutrient, sources in self.nutrition_priorities.items()
+        }
+        
+        # Category guessing: keyword -> category rank for whole-word hits, plus one
+        # pattern per category for keywords inside longer words
+        self._cat_names = tuple(CATEGORY_KEYWORDS)
+        self._cat_token_map: Dict[str, int] = {}
+        for rank, keywords in enumerate(CATEGORY_KEYWORDS.values()):
+            for keyword in keywords:
+                self._cat_token_map.setdefault(keyword, rank)
+        self._cat_patterns = tuple(
+            re.compile('|'.join(map(re.escape, keywords))) for keywords in CATEGORY_KEYWORDS.values()
+        )
+        
+        self._build_alternative_index()
+        # The alternatives database is fixed after construction, so lookups can be memoized
+        self._alternative_cached = functools.lru_cache(maxsize=self.ALTERNATIVE_CACHE_SIZE)(self._lookup_alternative)
+    
+    def _build_alternative_index(self):
+        """
+        Lay the alternatives database out as parallel per-key columns, and index the
+        keys for partial matching
+        """
+        self._alt_keys = tuple(self.healthy_alternatives)
+        self._alt_key_search = SubstringIndex(self._alt_keys)
+        self._alt_key_index = self._alt_key_search.index
+        entries = self.healthy_alternatives.values()
+        self._alt_alt = tuple(tuple(sys.intern(name) for name in entry['alternatives']) for entry in entries)
+        self._alt_reason = tuple(entry['reason'] for entry in entries)
+        self._alt_score = np.fromiter((entry['health_score'] for entry in entries), dtype=np.int8, count=len(entries))
     
     def get_healthy_alternative(self, item_name: str) -> Optional[Dict[str, any]]:
         """
         Get healthy alternative for a specific item
         """
         item_name = item_name.lower().strip()
-        
+        match = self._alternative_cached(item_name)
+        if match is None:
+            return None
+        return self._alternative_result(item_name, *match)
+    
+    def _lookup_alternative(self, item_name: str) -> Optional[Tuple[int, str]]:
+        """
+        Alternatives index and match type for a normalized item name, or None
+        """
         # Direct match
-        if item_name in self.healthy_alternatives:
-            alt_data = self.healthy_alternatives[item_name]
-            return {
-                'original_item': item_name,
-                'alternatives': alt_data['alternatives'],
-                'reason': alt_data['reason'],
-                'health_score': alt_data['health_score'],
-                'match_type': 'direct'
-            }
+        idx = self._alt_key_index.get(item_name)
+        if idx is not None:
+            return idx, 'direct'
         
         # Partial match
-        for key, alt_data in self.healthy_alternatives.items():
-            if key in item_name or item_name in key:
-                return {
-                    'original_item': item_name,
-                    'alternatives': alt_data['alternatives'],
-                    'reason': alt_data['reason'],
-                    'health_score': alt_data['health_score'],
-                    'match_type': 'partial'
-                }
+        idx = self._alt_key_search.first_match(item_name)
+        if idx is not None:
+            return idx, 'partial'
         
         return None
     
+    def _alternative_result(self, item_name: str, idx: int, match_type: str) -> Dict[str, any]:
+        """
+        Materialize the alternative record at idx for item_name
+        """
+        return {
+            'original_item': item_name,
+            'alternatives': list(self._alt_alt[idx]),
+            'reason': self._alt_reason[idx],
+            'health_score': int(self._alt_score[idx]),
+            'match_type': match_type
+        }
+    
     def get_multiple_alternatives(self, items: List[str]) -> List[Dict[str, any]]:
         """
         Get healthy alternatives for multiple items
         """
-        alternatives = []
-        
-        for item_name in items:
-            alternative = self.get_healthy_alternative(item_name)
-            if alternative:
-                alternatives.append(alternative)
-        
-        return alternatives
+        # One pass over the memoized index lookups; records are built only for matches
+        item_names = [item_name.lower().strip() for item_name in items]
+        matches = map(self._alternative_cached, item_names)
+        return [
+            self._alternative_result(item_name, *match)
+            for item_name, match in zip(item_names, matches)
+            if match is not None
+        ]
     
     def suggest_healthier_shopping_list(self, shopping_list) -> List[Dict[str, any]]:
         """
         Analyze entire shopping list and suggest healthier alternatives
         """
-        suggestions = []
-        
+        matched = []
         for item in shopping_list.items:
-            alternative = self.get_healthy_alternative(item.name)
-            
-            if alternative:
-                suggestions.append({
-                    'original_item': item,
-                    'recommendation': alternative,
-                    'priority': self._calculate_priority(item, alternative)
-                })
+            item_name = item.name.lower().strip()
+            match = self._alternative_cached(item_name)
+            if match is not None:
+                matched.append((item, item_name, match))
+        
+        priorities = self._calculate_priority(
+            np.fromiter((idx for _, _, (idx, _) in matched), dtype=np.intp, count=len(matched))
+        )
+        
+        suggestions = [
+            {
+                'original_item': item,
+                'recommendation': self._alternative_result(item_name, idx, match_type),
+                'priority': priority
+            }
+            for (item, item_name, (idx, match_type)), priority in zip(matched, priorities.tolist())
+        ]
         
         # Sort by priority (health impact)
         suggestions.sort(key=lambda x: x['priority'], reverse=True)
@@ -242,86 +331,98 @@ class RecommendationEngine:
         suggestions = []
         
         # Analyze what's missing nutritionally
-        current_categories = set(item.category for item in current_list.items)
-        current_items = set(item.name.lower() for item in current_list.items)
+        current_items = current_list.lowercased_names
+        current_tokens = current_list.lowercased_name_tokens
+        # Substring checks run once against all names joined together; the food
+        # sources never contain the separator, so a hit cannot span two names
+        current_text = '\x00'.join(current_items)
         
         # Check for nutritional gaps
         for nutrient, food_sources in self.nutrition_priorities.items():
-            # Check if user has foods from this nutrient category
-            has_nutrient_source = any(
-                any(source in item for item in current_items) 
-                for source in food_sources
+            # Check if user has foods from this nutrient category: a whole-word
+            # hit settles it, otherwise fall back to substring matching
+            has_nutrient_source = (
+                not self._nutrition_priority_sets[nutrient].isdisjoint(current_tokens)
+                or any(source in current_text for source in food_sources)
             )
             
             if not has_nutrient_source:
-                # Suggest top 2 sources for this nutrient
+                # Suggest top 2 sources for this nutrient; none of them is on the list
                 for source in food_sources[:2]:
-                    if not any(source in item for item in current_items):
-                        suggestions.append({
-                            'item': source,
-                            'nutrient': nutrient,
-                            'reason': f'Boost {nutrient.replace("_", " ")} intake',
-                            'category': self._guess_category(source),
-                            'priority': 7
-                        })
+                    suggestions.append({
+                        'item': source,
+                        'nutrient': nutrient,
+                        'reason': f'Boost {nutrient.replace("_", " ")} intake',
+                        'category': self._guess_category(source),
+                        'priority': 7
+                    })
         
         return suggestions[:5]  # Top 5 nutrient boosters
     
-    def rate_shopping_list_healthiness(self, shopping_list) -> Dict[str, any]:
+    def rate_shopping_list_healthiness(self, shopping_list, include_breakdown: bool = True) -> Dict[str, any]:
         """
-        Rate the overall healthiness of a shopping list
+        Rate the overall healthiness of a shopping list; the per-item
+        breakdown is left out when include_breakdown is False
         """
-        if not shopping_list.items:
+        items = shopping_list.items
+        if not items:
             return {'score': 0, 'message': 'Empty shopping list'}
         
-        total_score = 0
-        item_scores = []
-        category_analysis = {}
-        
-        for item in shopping_list.items:
-            item_score = self._rate_item_healthiness(item)
-            item_scores.append({
-                'item': item.name,
-                'score': item_score,
-                'category': item.category
-            })
-            total_score += item_score
-            
-            # Category analysis
-            if item.category not in category_analysis:
-                category_analysis[item.category] = {'count': 0, 'total_score': 0}
-            category_analysis[item.category]['count'] += 1
-            category_analysis[item.category]['total_score'] += item_score
+        scores, category_ids, categories = self._score_items_vectorized(items)
         
         # Calculate average scores
-        avg_score = total_score / len(item_scores)
-        
-        # Category averages
-        for category in category_analysis:
-            cat_data = category_analysis[category]
-            cat_data['avg_score'] = cat_data['total_score'] / cat_data['count']
+        total_score = int(scores.sum())
+        avg_score = total_score / len(items)
+        
+        # Category analysis, in order of first appearance
+        cat_totals = np.bincount(category_ids, weights=scores, minlength=len(categories)).astype(np.int64).tolist()
+        cat_counts = np.bincount(category_ids, minlength=len(categories)).tolist()
+        category_analysis = {
+            category: {'count': count, 'total_score': cat_total, 'avg_score': cat_total / count}
+            for category, count, cat_total in zip(categories, cat_counts, cat_totals)
+        }
         
-        return {
+        rating = {
             'overall_score': round(avg_score, 1),
-            'total_items': len(item_scores),
-            'item_breakdown': item_scores,
-            'category_analysis': category_analysis,
-            'health_grade': self._get_health_grade(avg_score),
-            'recommendations': self._get_score_recommendations(avg_score)
+            'total_items': len(items)
         }
+        if include_breakdown:
+            rating['item_breakdown'] = [
+                {'item': item.name, 'score': score, 'category': item.category}
+                for item, score in zip(items, scores.tolist())
+            ]
+        rating['category_analysis'] = category_analysis
+        rating['health_grade'] = self._get_health_grade(avg_score)
+        rating['recommendations'] = self._get_score_recommendations(avg_score)
+        return rating
     
-    def _calculate_priority(self, item: GroceryItem, alternative: Dict[str, any]) -> int:
+    def _score_items_vectorized(self, items: List[GroceryItem]) -> Tuple[np.ndarray, np.ndarray, List[str]]:
         """
-        Calculate priority for suggesting an alternative
+        Per-item health scores and category codes as arrays, plus the category
+        names indexed by code in order of first appearance
         """
-        base_priority = alternative['health_score']
+        codes: Dict[str, int] = {}
+        category_ids = np.fromiter(
+            (codes.setdefault(item.category, len(codes)) for item in items),
+            dtype=np.intp, count=len(items)
+        )
+        scores = np.fromiter(
+            (self._rate_item_healthiness(item) for item in items),
+            dtype=np.int8, count=len(items)
+        )
+        return scores, category_ids, list(codes)
+    
+    def _calculate_priority(self, alt_indices: np.ndarray) -> np.ndarray:
+        """
+        Calculate priority for suggesting each alternative in an array of alternatives indices
+        """
+        base_priority = self._alt_score[alt_indices].astype(np.int64)
         
         # Boost priority for frequently purchased items
         # (This could be enhanced with purchase frequency data)
         
         # Boost priority for items with higher health impact
-        if alternative['health_score'] >= 8:
-            base_priority += 2
+        base_priority[base_priority >= 8] += 2
         
         return base_priority
     
@@ -329,43 +430,24 @@ class RecommendationEngine:
         """
         Rate individual item healthiness (1-10 scale)
         """
+        item_name = item.name.lower()
+        item_category = item.category.lower()
+        
         base_score = 5  # Neutral score
         
         # Organic bonus
         if item.is_organic:
             base_score += 2
         
-        # Category-based scoring
-        category_scores = {
-            'fruits': 8,
-            'vegetables': 8,
-            'whole grains': 7,
-            'lean protein': 7,
-            'dairy': 5,
-            'snacks': 3,
-            'processed': 2,
-            'sweets': 2
-        }
-        
-        item_name = item.name.lower()
-        item_category = item.category.lower()
-        
         # Check for healthy keywords
-        healthy_keywords = ['whole', 'organic', 'fresh', 'lean', 'low-fat', 'natural']
-        unhealthy_keywords = ['fried', 'processed', 'sugary', 'artificial', 'high-sodium']
+        if HEALTHY_KEYWORDS_RE.search(item_name):
+            base_score += 1
         
-        for keyword in healthy_keywords:
-            if keyword in item_name:
-                base_score += 1
-                break
-        
-        for keyword in unhealthy_keywords:
-            if keyword in item_name:
-                base_score -= 2
-                break
+        if UNHEALTHY_KEYWORDS_RE.search(item_name):
+            base_score -= 2
         
         # Category-based adjustment
-        for category, score in category_scores.items():
+        for category, score in CATEGORY_SCORES.items():
             if category in item_category or category in item_name:
                 base_score = max(base_score, score)
                 break
@@ -376,16 +458,7 @@ class RecommendationEngine:
         """
         Convert numeric score to letter grade
         """
-        if score >= 8:
-            return 'A'
-        elif score >= 7:
-            return 'B'
-        elif score >= 6:
-            return 'C'
-        elif score >= 5:
-            return 'D'
-        else:
-            return 'F'
+        return GRADE_LETTERS[bisect.bisect_right(GRADE_BOUNDS, score)]
     
     def _get_score_recommendations(self, score: float) -> List[str]:
         """
@@ -408,16 +481,16 @@ class RecommendationEngine:
         """
         item_name = item_name.lower()
         
-        categories = {
-            'fruits': ['fruit', 'berry', 'apple', 'banana', 'orange'],
-            'vegetables': ['vegetable', 'greens', 'carrot', 'broccoli', 'spinach'],
-            'protein': ['meat', 'fish', 'chicken', 'egg', 'bean', 'legume'],
-            'dairy': ['milk', 'cheese', 'yogurt'],
-            'grains': ['grain', 'rice', 'bread', 'pasta', 'oat']
-        }
+        # Whole-word keyword hits give the best category found so far
+        best = len(self._cat_names)
+        for token in item_name.split():
+            rank = self._cat_token_map.get(token)
+            if rank is not None and rank < best:
+                best = rank
         
-        for category, keywords in categories.items():
-            if any(keyword in item_name for keyword in keywords):
-                return category
+        # Only higher-priority categories can still win, through a keyword inside a longer word
+        for rank in range(best):
+            if self._cat_patterns[rank].search(item_name):
+                return self._cat_names[rank]
         
-        return 'other'
\ No newline at end of file
+        return self._cat_names[best] if best < len(self._cat_names) else 'other'
\ No newline at end of file
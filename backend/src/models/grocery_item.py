@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class GroceryItem:
     """
     Represents a grocery item with all necessary attributes for tracking
@@ -1,5 +1,7 @@
-from typing import List, Optional, Dict
+import copy
+from typing import List, Optional, Dict, Any, FrozenSet, Tuple
 from datetime import datetime
+import numpy as np
 from .grocery_item import GroceryItem
 
 class ShoppingList:
@@ -10,6 +12,8 @@ class ShoppingList:
     def __init__(self):
         self._items: List[GroceryItem] = []
         self._created_date = datetime.now()
+        # Lowercased item names and their words, rebuilt after the list changes
+        self._name_cache: Optional[Tuple[FrozenSet[str], FrozenSet[str]]] = None
     
     @property
     def items(self) -> List[GroceryItem]:
@@ -26,6 +30,24 @@ class ShoppingList:
         """Get total quantity of all items"""
         return sum(item.quantity for item in self._items)
     
+    @property
+    def lowercased_names(self) -> FrozenSet[str]:
+        """Lowercased names of the items on the list (cached until the list changes)"""
+        return self._names()[0]
+    
+    @property
+    def lowercased_name_tokens(self) -> FrozenSet[str]:
+        """Words of the lowercased item names (cached until the list changes)"""
+        return self._names()[1]
+    
+    def _names(self) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """Build the lowercased name and word sets on first use after a change"""
+        if self._name_cache is None:
+            names = frozenset(item.name.lower() for item in self._items)
+            tokens = frozenset(word for name in names for word in name.split())
+            self._name_cache = (names, tokens)
+        return self._name_cache
+    
     def add_item(self, item: GroceryItem) -> bool:
         """
         Add an item to the shopping list
@@ -38,6 +60,7 @@ class ShoppingList:
             return True
         else:
             self._items.append(item)
+            self._name_cache = None
             return True
     
     def remove_item(self, name: str, category: str = None) -> bool:
@@ -48,6 +71,7 @@ class ShoppingList:
         item = self.find_item(name, category)
         if item:
             self._items.remove(item)
+            self._name_cache = None
             return True
         return False
     
@@ -88,11 +112,54 @@ class ShoppingList:
             categories[item.category].append(item)
         return categories
     
+    def get_summary(self) -> Dict[str, Any]:
+        """
+        Compute summary statistics over parallel arrays of the item fields
+        instead of looping over the GroceryItem objects once per statistic
+        """
+        if not self._items:
+            return {
+                'total_items': 0,
+                'total_quantity': 0,
+                'estimated_total': 0,
+                'categories': {},
+                'organic_count': 0
+            }
+        
+        qty = np.array([item.quantity for item in self._items])
+        price = np.array([item.price for item in self._items], dtype=float)
+        is_organic = np.array([item.is_organic for item in self._items], dtype=bool)
+        category_names, category_codes = np.unique(
+            [item.category for item in self._items], return_inverse=True
+        )
+        
+        # Per-category quantity totals, kept in the quantity dtype
+        category_totals = np.zeros(len(category_names), dtype=qty.dtype)
+        np.add.at(category_totals, category_codes, qty)
+        
+        return {
+            'total_items': len(self._items),
+            'total_quantity': qty.sum().item(),
+            'estimated_total': float((qty * price).sum()),
+            'categories': dict(zip(category_names.tolist(), category_totals.tolist())),
+            'organic_count': int(is_organic.sum())
+        }
+    
+    def copy(self) -> 'ShoppingList':
+        """
+        Independent copy of the shopping list and its items
+        """
+        shopping_list = ShoppingList()
+        shopping_list._items = [copy.copy(item) for item in self._items]
+        shopping_list._created_date = self._created_date
+        return shopping_list
+    
     def clear_list(self) -> None:
         """
         Clear all items from the shopping list
         """
         self._items.clear()
+        self._name_cache = None
     
     def get_expiring_items(self, days_threshold: int = 3) -> List[GroceryItem]:
         """
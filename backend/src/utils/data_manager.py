@@ -1,5 +1,6 @@
 import json
 import os
+import threading
 from datetime import datetime
 from typing import Dict, Any, Optional
 from ..models.shopping_list import ShoppingList
@@ -19,6 +20,13 @@ class DataManager:
         # Ensure data directory exists
         os.makedirs(data_dir, exist_ok=True)
         
+        # In-process shopping list cache, keyed on the file's mtime so writes
+        # from other DataManager instances or processes still invalidate it.
+        # Callers only ever get copies, so their edits cannot leak into it
+        self._shopping_list_cache: Optional[ShoppingList] = None
+        self._shopping_list_mtime: Optional[int] = None
+        self._shopping_list_lock = threading.RLock()
+        
         # Initialize default preferences
         self.default_preferences = {
             'expiration_reminder_days': 3,
@@ -33,33 +41,48 @@ class DataManager:
         """
         Save shopping list to JSON file
         """
-        try:
-            data = shopping_list.to_dict()
-            data['last_saved'] = datetime.now().isoformat()
-            
-            with open(self.shopping_list_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            return True
-        except Exception as e:
-            print(f"Error saving shopping list: {e}")
-            return False
+        with self._shopping_list_lock:
+            try:
+                data = shopping_list.to_dict()
+                data['last_saved'] = datetime.now().isoformat()
+                
+                with open(self.shopping_list_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                
+                self._shopping_list_cache = shopping_list.copy()
+                self._shopping_list_mtime = os.stat(self.shopping_list_file).st_mtime_ns
+                return True
+            except Exception as e:
+                print(f"Error saving shopping list: {e}")
+                self._shopping_list_cache = None
+                self._shopping_list_mtime = None
+                return False
     
     def load_shopping_list(self) -> ShoppingList:
         """
-        Load shopping list from JSON file
+        Load shopping list from JSON file, reusing the cached copy while the
+        file is unchanged on disk
         """
-        try:
-            if os.path.exists(self.shopping_list_file):
-                with open(self.shopping_list_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return ShoppingList.from_dict(data)
-            else:
-                # Return empty shopping list if file doesn't exist
+        with self._shopping_list_lock:
+            try:
+                if os.path.exists(self.shopping_list_file):
+                    mtime = os.stat(self.shopping_list_file).st_mtime_ns
+                    if self._shopping_list_cache is not None and mtime == self._shopping_list_mtime:
+                        return self._shopping_list_cache.copy()
+                    
+                    with open(self.shopping_list_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    shopping_list = ShoppingList.from_dict(data)
+                    
+                    self._shopping_list_cache = shopping_list.copy()
+                    self._shopping_list_mtime = mtime
+                    return shopping_list
+                else:
+                    # Return empty shopping list if file doesn't exist
+                    return ShoppingList()
+            except Exception as e:
+                print(f"Error loading shopping list: {e}")
                 return ShoppingList()
-        except Exception as e:
-            print(f"Error loading shopping list: {e}")
-            return ShoppingList()
     
     def save_purchase_history(self, purchase_history: PurchaseHistory) -> bool:
         """
@@ -2,13 +2,22 @@
 Enhanced DataManager with PostgreSQL support
 Maintains backward compatibility with JSON-based storage
 """
+import csv
+import io
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Union
+from itertools import chain, islice
+from typing import Dict, Any, Optional, List, Union, Iterable, Iterator
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, insert
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+from ..models.grocery_item import GroceryItem
 from ..models.shopping_list import ShoppingList as JsonShoppingList
 from ..models.purchase_history import PurchaseHistory as JsonPurchaseHistory
 from ..database import (
@@ -21,6 +30,8 @@ class DatabaseDataManager:
     Enhanced data manager supporting both JSON and PostgreSQL storage
     """
     
+    PURCHASE_BATCH_SIZE = 10000  # rows per multi-row INSERT when saving purchases
+    
     def __init__(self, use_database: bool = False, data_dir: str = "data"):
         self.use_database = use_database
         self.data_dir = data_dir
@@ -190,6 +201,21 @@ class DatabaseDataManager:
             print(f"Error loading shopping list from JSON: {e}")
             return JsonShoppingList()
     
+    def load_shopping_list_data(self) -> Dict:
+        """Load the shopping list as a plain {'items': [...]} dict from JSON or database"""
+        if self.use_database:
+            return self._load_shopping_list_db()
+        
+        try:
+            if not os.path.exists(self.shopping_list_file):
+                return {"items": []}
+            with open(self.shopping_list_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {"items": [GroceryItem.from_dict(item_data).to_dict() for item_data in data.get('items', [])]}
+        except Exception as e:
+            print(f"Error loading shopping list from JSON: {e}")
+            return {"items": []}
+    
     def _load_shopping_list_db(self) -> Dict:
         """Load shopping list from database"""
         db = self._get_db()
@@ -292,20 +318,7 @@ class DatabaseDataManager:
             db.query(Purchase).filter(Purchase.user_id == self.default_user_id).delete()
             
             # Add purchases
-            for purchase_data in purchases_data:
-                item = self._get_or_create_item(db, purchase_data)
-                
-                purchase = Purchase(
-                    user_id=self.default_user_id,
-                    item_id=item.id,
-                    quantity=purchase_data.get('quantity', 1),
-                    unit=purchase_data.get('unit', 'piece'),
-                    price_per_unit=purchase_data.get('price', 0.0),
-                    total_price=purchase_data.get('price', 0.0) * purchase_data.get('quantity', 1),
-                    purchase_date=datetime.fromisoformat(purchase_data.get('purchase_date', datetime.now().isoformat())),
-                    is_organic=purchase_data.get('is_organic', False)
-                )
-                db.add(purchase)
+            self._insert_purchases(db, purchases_data)
             
             db.commit()
             return True
@@ -317,6 +330,82 @@ class DatabaseDataManager:
         finally:
             db.close()
     
+    def bulk_save_purchases(self, purchases: Iterable[Dict], replace: bool = False) -> int:
+        """
+        Append purchase records to the database in batches, returns the number inserted.
+        With replace=True the user's existing purchases are deleted first, in the same transaction.
+        An empty iterable leaves the database untouched
+        """
+        purchases = iter(purchases)
+        first = next(purchases, None)
+        if first is None:
+            return 0
+        
+        db = self._get_db()
+        try:
+            if replace:
+                db.query(Purchase).filter(Purchase.user_id == self.default_user_id).delete()
+            count = self._insert_purchases(db, chain((first,), purchases))
+            db.commit()
+            return count
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _insert_purchases(self, db: Session, purchases: Iterable[Dict]) -> int:
+        """Insert purchase dicts PURCHASE_BATCH_SIZE rows at a time, resolving each item once"""
+        item_ids = {}
+        count = 0
+        purchases = iter(purchases)
+        
+        while True:
+            batch = list(islice(purchases, self.PURCHASE_BATCH_SIZE))
+            if not batch:
+                return count
+            
+            rows = []
+            for purchase_data in batch:
+                key = (purchase_data.get('name', ''), purchase_data.get('category', 'pantry'))
+                item_id = item_ids.get(key)
+                if item_id is None:
+                    item_id = item_ids[key] = self._get_or_create_item(db, purchase_data).id
+                
+                rows.append({
+                    'user_id': self.default_user_id,
+                    'item_id': item_id,
+                    'quantity': purchase_data.get('quantity', 1),
+                    'unit': purchase_data.get('unit', 'piece'),
+                    'price_per_unit': purchase_data.get('price', 0.0),
+                    'total_price': purchase_data.get('price', 0.0) * purchase_data.get('quantity', 1),
+                    'purchase_date': datetime.fromisoformat(purchase_data.get('purchase_date', datetime.now().isoformat())),
+                    'is_organic': purchase_data.get('is_organic', False)
+                })
+            
+            self._write_purchase_rows(db, rows)
+            count += len(rows)
+    
+    def _write_purchase_rows(self, db: Session, rows: List[Dict]):
+        """COPY rows into purchases on psycopg2, multi-row INSERT on other drivers"""
+        if db.get_bind().dialect.driver != 'psycopg2':
+            db.execute(insert(Purchase), rows)
+            return
+        
+        columns = list(rows[0])
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator='\n').writerows([row[column] for column in columns] for row in rows)
+        buf.seek(0)
+        
+        # Raw DBAPI cursor on the session's connection, so the COPY joins the open transaction
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {Purchase.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf
+            )
+        finally:
+            cursor.close()
+    
     def load_purchase_history(self) -> Union[JsonPurchaseHistory, Dict]:
         """Load purchase history from JSON or database"""
         if self.use_database:
@@ -337,6 +426,22 @@ class DatabaseDataManager:
             print(f"Error loading purchase history from JSON: {e}")
             return JsonPurchaseHistory()
     
+    def load_purchase_history_stream(self) -> Iterator[Dict]:
+        """Yield purchase records from the JSON file one at a time, normalized like GroceryItem"""
+        if not os.path.exists(self.purchase_history_file):
+            return
+        
+        with open(self.purchase_history_file, 'rb') as f:
+            # ijson parses incrementally; without it the file is parsed whole but no
+            # PurchaseHistory object graph is built
+            if ijson is not None:
+                records = ijson.items(f, 'purchases.item', use_float=True)
+            else:
+                records = json.load(f).get('purchases', [])
+            
+            for record in records:
+                yield GroceryItem.from_dict(record).to_dict()
+    
     def _load_purchase_history_db(self) -> Dict:
         """Load purchase history from database"""
         db = self._get_db()
@@ -15,6 +15,9 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 import math
 import random
+import time
+import threading
+import numpy as np
 
 class Store:
     """Represents a grocery store with location and inventory data"""
@@ -54,11 +57,24 @@ class StoreIntegrationEngine:
     Advanced store integration system for price comparison and shopping optimization
     """
     
+    CATEGORIES_TTL = 300  # seconds before the cached category list is rebuilt
+    PRICE_HISTORY_TTL = 300  # seconds a simulated price history is reused
+    PRICE_HISTORY_CACHE_SIZE = 1024
+    
     def __init__(self):
         self.stores: Dict[str, Store] = {}
         self.user_location = {'lat': 40.7128, 'lng': -74.0060}  # Default: NYC
+        self._inventory_version = 0
+        self._categories_cache: Optional[List[str]] = None
+        self._categories_cached_at = 0.0
+        self._store_dict_cache: Dict[str, Dict] = {}
+        self._inv_soa: Dict[str, Dict[str, Any]] = {}
+        self._price_matrix: Optional[Tuple[np.ndarray, np.ndarray, Dict[str, int]]] = None
+        self._price_history_cache: Dict[Tuple[str, int], Tuple[float, Dict]] = {}
+        self._price_history_lock = threading.Lock()
         self._initialize_sample_stores()
         self._initialize_sample_inventory()
+        self._build_store_index()
     
     def _initialize_sample_stores(self):
         """Initialize sample stores for demonstration"""
@@ -165,6 +181,194 @@ class StoreIntegrationEngine:
                     'stock_level': random.randint(0, 100),
                     'last_updated': datetime.now().isoformat()
                 }
+        
+        self.invalidate_inventory_caches()
+    
+    def invalidate_inventory_caches(self):
+        """Drop data derived from store inventories, call after changing any inventory"""
+        self._inventory_version += 1
+        self._categories_cache = None
+        self._inv_soa = {}
+        self._price_matrix = None
+        with self._price_history_lock:
+            self._price_history_cache.clear()
+    
+    def _get_inventory_soa(self, store_id: str) -> Dict[str, Any]:
+        """Column arrays over a store's inventory in insertion order, built on first use"""
+        soa = self._inv_soa.get(store_id)
+        if soa is None:
+            inventory = self.stores[store_id].inventory
+            items = list(inventory.values())
+            soa = self._inv_soa[store_id] = {
+                'keys': list(inventory),
+                'items': items,
+                'category_lower': np.asarray([item.get('category', '').lower() for item in items], dtype=object),
+                'price': np.asarray([item.get('price', 0) for item in items], dtype=np.float64),
+                'price_cents': np.asarray([round(item.get('price', 0) * 100) for item in items], dtype=np.int64),
+                'stock': np.asarray([item.get('stock_level', 0) for item in items], dtype=np.int32),
+                'in_stock': np.asarray([bool(item.get('in_stock', False)) for item in items], dtype=bool)
+            }
+            for column in soa.values():
+                if isinstance(column, np.ndarray):
+                    column.setflags(write=False)
+        return soa
+    
+    def _get_price_matrix(self) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
+        """Item x store price and in-stock matrices keyed by lowercased item name, built on first use
+        
+        The last row is all-missing so unknown items can be looked up with index -1.
+        """
+        if self._price_matrix is None:
+            item_idx: Dict[str, int] = {}
+            for store in self.stores.values():
+                for inv_item in store.inventory.values():
+                    item_idx.setdefault(inv_item['name'].lower(), len(item_idx))
+            
+            prices = np.full((len(item_idx) + 1, len(self._store_ids)), np.nan)
+            in_stock = np.zeros(prices.shape, dtype=bool)
+            for col, store_id in enumerate(self._store_ids):
+                seen = set()
+                for inv_item in self.stores[store_id].inventory.values():
+                    row = item_idx[inv_item['name'].lower()]
+                    if row in seen:
+                        continue  # first match in inventory order wins
+                    seen.add(row)
+                    prices[row, col] = inv_item['price']
+                    in_stock[row, col] = inv_item['in_stock']
+            
+            prices.setflags(write=False)
+            in_stock.setflags(write=False)
+            self._price_matrix = (prices, in_stock, item_idx)
+        return self._price_matrix
+    
+    def warm_caches(self):
+        """Build every lazily created index up front, e.g. in a preforking server's master"""
+        for store_id in self.stores:
+            self._get_inventory_soa(store_id)
+        self._get_price_matrix()
+        self._get_ball_tree()
+        self.get_categories_cached()
+    
+    def filter_inventory(self, store_id: str, category: Optional[str] = None,
+                         in_stock_only: bool = False) -> List[Tuple[str, Dict]]:
+        """(item_key, item_data) pairs of a store's inventory matching the filters, in inventory order"""
+        soa = self._get_inventory_soa(store_id)
+        mask = np.ones(len(soa['items']), dtype=bool)
+        
+        if category:
+            mask &= soa['category_lower'] == category.lower()
+        if in_stock_only:
+            mask &= soa['in_stock']
+        
+        keys, items = soa['keys'], soa['items']
+        return [(keys[i], items[i]) for i in np.flatnonzero(mask).tolist()]
+    
+    def get_current_deals(self, limit_per_store: int = 5) -> List[Dict]:
+        """Simulated deals per store: prices ending in .99, low stock (clearance) or low prices"""
+        deals = []
+        
+        for store_id, store in self.stores.items():
+            soa = self._get_inventory_soa(store_id)
+            price, stock = soa['price'], soa['stock']
+            
+            ends_99 = soa['price_cents'] % 100 == 99
+            is_deal = soa['in_stock'] & (ends_99 | (stock < 20) | (price < 2.00))
+            deal_idx = np.flatnonzero(is_deal)
+            
+            if deal_idx.size:
+                store_deals = []
+                for i in deal_idx[:limit_per_store].tolist():
+                    item_data = soa['items'][i]
+                    stock_level = item_data.get('stock_level', 0)
+                    store_deals.append({
+                        'item_name': item_data['name'],
+                        'category': item_data['category'],
+                        'price': item_data.get('price', 0),
+                        'unit': item_data['unit'],
+                        'deal_type': 'clearance' if stock_level < 20 else 'special_price',
+                        'stock_level': stock_level
+                    })
+                
+                deals.append({
+                    'store_id': store_id,
+                    'store_name': store.name,
+                    'deals': store_deals,
+                    'deals_count': int(deal_idx.size)
+                })
+        
+        return deals
+    
+    def get_categories_cached(self) -> List[str]:
+        """Sorted item categories across all stores, cached until inventory changes or TTL expires"""
+        now = time.monotonic()
+        if self._categories_cache is None or now - self._categories_cached_at > self.CATEGORIES_TTL:
+            categories = set()
+            for store in self.stores.values():
+                for item_data in store.inventory.values():
+                    if 'category' in item_data:
+                        categories.add(item_data['category'])
+            
+            out = list(categories)
+            out.sort()
+            self._categories_cache = out
+            self._categories_cached_at = now
+        
+        return self._categories_cache
+    
+    def _build_store_index(self):
+        """Cache store coordinates and lowercased search text, call after changing stores"""
+        self._store_ids = list(self.stores)
+        self._name_lower = [store.name.lower() for store in self.stores.values()]
+        self._addr_lower = [store.address.lower() for store in self.stores.values()]
+        
+        # Coordinate columns share one contiguous read-only block; nothing on the
+        # request path writes to these arrays, so preforked workers never copy them
+        coords = np.empty((3, len(self._store_ids)), dtype=float)
+        coords[0] = [store.lat for store in self.stores.values()]
+        coords[1] = [store.lng for store in self.stores.values()]
+        coords[2] = np.cos(np.radians(coords[0]))
+        coords.setflags(write=False)
+        self._lats, self._lngs, self._cos_lats = coords
+        
+        self._store_index = {store_id: i for i, store_id in enumerate(self._store_ids)}
+        self._dist_matrix = self._haversine_matrix(self._lats, self._lngs)
+        self._dist_matrix.setflags(write=False)
+        self._store_dict_cache = {}
+        self._ball_tree = None
+        self._user_distances = None
+    
+    def _get_ball_tree(self):
+        """Haversine BallTree over store coordinates, built on first use"""
+        if self._ball_tree is None:
+            from sklearn.neighbors import BallTree
+            self._ball_tree = BallTree(np.radians(np.c_[self._lats, self._lngs]), metric='haversine')
+        return self._ball_tree
+    
+    def distance_between(self, store_id_a: str, store_id_b: str) -> float:
+        """Precomputed haversine distance in miles between two stores"""
+        return float(self._dist_matrix[self._store_index[store_id_a], self._store_index[store_id_b]])
+    
+    def _get_user_distances(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact and pre-rounded (int32 hundredths of a mile) distances from the user to every store"""
+        location = (self.user_location['lat'], self.user_location['lng'])
+        if self._user_distances is None or self._user_distances[0] != location:
+            exact = self.calculate_distances(*location)
+            exact.setflags(write=False)
+            centi = np.rint(exact * 100).astype(np.int32)
+            centi.setflags(write=False)
+            self._user_distances = (location, exact, centi)
+        return self._user_distances[1:]
+    
+    def user_distance(self, store_id: str) -> float:
+        """Distance in miles from the user to a store, rounded to 2 decimals"""
+        return int(self._get_user_distances()[1][self._store_index[store_id]]) / 100
+    
+    def store_dict(self, store_id: str) -> Dict:
+        """Copy of the store's serialized metadata, built once per store"""
+        cached = self._store_dict_cache.get(store_id)
+        if cached is None:
+            cached = self._store_dict_cache[store_id] = self.stores[store_id].to_dict()
+        return cached.copy()
     
     def calculate_distance(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
         """Calculate distance between two points using Haversine formula"""
@@ -181,19 +385,63 @@ class StoreIntegrationEngine:
         
         return R * c
     
+    def calculate_distances(self, lat: float, lng: float, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """Haversine distance from a point to every store (or the given store indices), in _store_ids order"""
+        R = 3959  # Earth's radius in miles
+        
+        lats, lngs, cos_lats = self._lats, self._lngs, self._cos_lats
+        if indices is not None:
+            lats, lngs, cos_lats = lats[indices], lngs[indices], cos_lats[indices]
+        
+        delta_lat = np.radians(lats - lat)
+        delta_lng = np.radians(lngs - lng)
+        
+        a = (np.sin(delta_lat / 2) ** 2 +
+             math.cos(math.radians(lat)) * cos_lats * np.sin(delta_lng / 2) ** 2)
+        
+        return 2 * R * np.arcsin(np.sqrt(a))
+    
+    def search_stores(self, query: str) -> List[Dict]:
+        """Find stores whose name or address contains query, sorted by distance"""
+        matches = [
+            i for i, (name, address) in enumerate(zip(self._name_lower, self._addr_lower))
+            if query in name or query in address
+        ]
+        if not matches:
+            return []
+        
+        distances = self._get_user_distances()[1].tolist()
+        matching_stores = []
+        
+        for i in matches:
+            store_data = self.store_dict(self._store_ids[i])
+            store_data['distance'] = distances[i] / 100
+            matching_stores.append(store_data)
+        
+        # Sort by distance
+        matching_stores.sort(key=lambda x: x['distance'])
+        return matching_stores
+    
     def find_nearby_stores(self, max_distance: float = 10.0) -> List[Dict]:
         """Find stores within specified distance from user location"""
-        nearby_stores = []
+        if not self._store_ids or max_distance < 0:
+            return []
         
-        for store in self.stores.values():
-            distance = self.calculate_distance(
-                self.user_location['lat'], self.user_location['lng'],
-                store.lat, store.lng
-            )
-            
+        user_lat, user_lng = self.user_location['lat'], self.user_location['lng']
+        
+        # Radius query on the tree, then exact distances for the candidates only
+        R = 3959  # Earth's radius in miles
+        candidates = self._get_ball_tree().query_radius(
+            np.radians([[user_lat, user_lng]]), r=max_distance / R * (1 + 1e-9)
+        )[0]
+        candidates.sort()
+        exact, centi = self._get_user_distances()
+        
+        nearby_stores = []
+        for i, distance, distance_centi in zip(candidates.tolist(), exact[candidates].tolist(), centi[candidates].tolist()):
             if distance <= max_distance:
-                store_info = store.to_dict()
-                store_info['distance'] = round(distance, 2)
+                store_info = self.store_dict(self._store_ids[i])
+                store_info['distance'] = distance_centi / 100
                 nearby_stores.append(store_info)
         
         # Sort by distance
@@ -209,117 +457,143 @@ class StoreIntegrationEngine:
             'availability': {}
         }
         
-        for item_name in shopping_list:
-            price_comparison['items'][item_name] = {}
-            price_comparison['availability'][item_name] = {}
-            
-            item_prices = []
-            
-            for store_id, store in self.stores.items():
-                # Search for item in store inventory
-                item_found = None
-                for inv_key, inv_item in store.inventory.items():
-                    if inv_item['name'].lower() == item_name.lower():
-                        item_found = inv_item
-                        break
-                
-                if item_found:
-                    price_comparison['items'][item_name][store_id] = {
-                        'price': item_found['price'],
-                        'in_stock': item_found['in_stock'],
-                        'store_name': store.name
+        prices, in_stock, item_idx = self._get_price_matrix()
+        store_ids = self._store_ids
+        store_names = [self.stores[store_id].name for store_id in store_ids]
+        
+        # One row per shopping list entry; unknown items map to the all-missing last row
+        rows = np.asarray([item_idx.get(item_name.lower(), -1) for item_name in shopping_list], dtype=np.intp)
+        sub_prices = prices[rows]
+        sub_in_stock = in_stock[rows]
+        
+        # Cheapest in-stock store per item (first store wins ties)
+        stock_prices = np.where(sub_in_stock, sub_prices, np.inf)
+        best_cols = stock_prices.argmin(axis=1)
+        has_stock = sub_in_stock.any(axis=1)
+        
+        price_rows = sub_prices.tolist()
+        stock_rows = sub_in_stock.tolist()
+        
+        for pos, item_name in enumerate(shopping_list):
+            item_prices = {}
+            availability = {}
+            for col, store_id in enumerate(store_ids):
+                price = price_rows[pos][col]
+                if price == price:  # NaN marks items the store does not carry
+                    item_prices[store_id] = {
+                        'price': price,
+                        'in_stock': stock_rows[pos][col],
+                        'store_name': store_names[col]
                     }
-                    price_comparison['availability'][item_name][store_id] = item_found['in_stock']
-                    
-                    if item_found['in_stock']:
-                        item_prices.append((store_id, item_found['price']))
+                    availability[store_id] = stock_rows[pos][col]
                 else:
-                    price_comparison['items'][item_name][store_id] = {
+                    item_prices[store_id] = {
                         'price': None,
                         'in_stock': False,
-                        'store_name': store.name
+                        'store_name': store_names[col]
                     }
-                    price_comparison['availability'][item_name][store_id] = False
+                    availability[store_id] = False
+            
+            price_comparison['items'][item_name] = item_prices
+            price_comparison['availability'][item_name] = availability
             
             # Find best deal for this item
-            if item_prices:
-                best_store, best_price = min(item_prices, key=lambda x: x[1])
+            if has_stock[pos]:
+                best_col = int(best_cols[pos])
                 price_comparison['best_deals'][item_name] = {
-                    'store_id': best_store,
-                    'store_name': self.stores[best_store].name,
-                    'price': best_price
+                    'store_id': store_ids[best_col],
+                    'store_name': store_names[best_col],
+                    'price': price_rows[pos][best_col]
                 }
         
-        # Calculate store totals
-        for store_id in self.stores:
-            total = 0
-            items_available = 0
-            
-            for item_name in shopping_list:
-                if (item_name in price_comparison['items'] and 
-                    store_id in price_comparison['items'][item_name]):
-                    item_data = price_comparison['items'][item_name][store_id]
-                    if item_data['price'] and item_data['in_stock']:
-                        total += item_data['price']
-                        items_available += 1
-            
+        # Calculate store totals (zero prices count as unavailable)
+        available = sub_in_stock & (np.nan_to_num(sub_prices) != 0)
+        totals = np.where(available, sub_prices, 0.0).sum(axis=0).tolist()
+        items_available = available.sum(axis=0).tolist()
+        
+        for col, store_id in enumerate(store_ids):
             price_comparison['store_totals'][store_id] = {
-                'total': round(total, 2),
-                'items_available': items_available,
-                'items_missing': len(shopping_list) - items_available,
-                'store_name': self.stores[store_id].name
+                'total': round(totals[col], 2) if items_available[col] else 0,
+                'items_available': items_available[col],
+                'items_missing': len(shopping_list) - items_available[col],
+                'store_name': store_names[col]
             }
         
         return price_comparison
     
+    @staticmethod
+    def _haversine_matrix(lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """Pairwise haversine distances in miles between all given points"""
+        R = 3959  # Earth's radius in miles
+        
+        lat_rad = np.radians(lats)
+        delta_lat = lat_rad[:, None] - lat_rad[None, :]
+        delta_lng = np.radians(lngs[:, None] - lngs[None, :])
+        
+        a = (np.sin(delta_lat / 2) ** 2 +
+             np.cos(lat_rad)[:, None] * np.cos(lat_rad)[None, :] * np.sin(delta_lng / 2) ** 2)
+        
+        return 2 * R * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    
+    @staticmethod
+    def _two_opt(tour: List[int], dist: List[List[float]]) -> List[int]:
+        """Improve a closed tour (first and last node fixed) by 2-opt segment reversals"""
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, len(tour) - 2):
+                for j in range(i + 1, len(tour) - 1):
+                    a, b, c, d = tour[i - 1], tour[i], tour[j], tour[j + 1]
+                    if dist[a][c] + dist[b][d] < dist[a][b] + dist[c][d] - 1e-9:
+                        tour[i:j + 1] = tour[i:j + 1][::-1]
+                        improved = True
+        return tour
+    
     def optimize_shopping_route(self, selected_stores: List[str]) -> Dict:
         """Optimize route for visiting multiple stores"""
         if not selected_stores:
             return {'route': [], 'total_distance': 0, 'estimated_time': 0}
         
-        # Simple nearest neighbor algorithm for route optimization
+        # Node 0 is the user's location, node i is selected_stores[i - 1]
         user_loc = self.user_location
-        current_location = user_loc
-        remaining_stores = selected_stores.copy()
+        stores = [self.stores[store_id] for store_id in selected_stores]
+        indices = [self._store_index[store_id] for store_id in selected_stores]
+        
+        # Store-to-store legs come from the precomputed matrix, only the user row is computed
+        user_row = self.calculate_distances(user_loc['lat'], user_loc['lng'], indices)
+        dist_matrix = np.zeros((len(stores) + 1, len(stores) + 1))
+        dist_matrix[0, 1:] = user_row
+        dist_matrix[1:, 0] = user_row
+        dist_matrix[1:, 1:] = self._dist_matrix[np.ix_(indices, indices)]
+        dist = dist_matrix.tolist()
+        
+        # Nearest neighbor tour as the starting point
+        remaining = list(range(1, len(stores) + 1))
+        tour = [0]
+        while remaining:
+            nearest = min(remaining, key=lambda node: dist[tour[-1]][node])
+            tour.append(nearest)
+            remaining.remove(nearest)
+        tour.append(0)
+        
+        # 2-opt post-pass removes crossing legs from the greedy tour
+        tour = self._two_opt(tour, dist)
+        
         optimized_route = []
         total_distance = 0
-        
-        while remaining_stores:
-            nearest_store = None
-            min_distance = float('inf')
-            
-            for store_id in remaining_stores:
-                store = self.stores[store_id]
-                distance = self.calculate_distance(
-                    current_location['lat'], current_location['lng'],
-                    store.lat, store.lng
-                )
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_store = store_id
-            
-            if nearest_store:
-                store = self.stores[nearest_store]
-                optimized_route.append({
-                    'store_id': nearest_store,
-                    'store_name': store.name,
-                    'address': store.address,
-                    'distance_from_previous': round(min_distance, 2)
-                })
-                
-                total_distance += min_distance
-                current_location = {'lat': store.lat, 'lng': store.lng}
-                remaining_stores.remove(nearest_store)
+        for previous, node in zip(tour, tour[1:-1]):
+            store = stores[node - 1]
+            optimized_route.append({
+                'store_id': store.store_id,
+                'store_name': store.name,
+                'address': store.address,
+                'distance_from_previous': round(dist[previous][node], 2)
+            })
+            total_distance += dist[previous][node]
         
         # Add return distance to starting point
-        if optimized_route:
-            last_store = self.stores[optimized_route[-1]['store_id']]
-            return_distance = self.calculate_distance(
-                last_store.lat, last_store.lng,
-                user_loc['lat'], user_loc['lng']
-            )
-            total_distance += return_distance
+        return_distance = dist[tour[-2]][0]
+        total_distance += return_distance
         
         # Estimate time (assume 30 mph average speed + 20 min per store)
         travel_time = (total_distance / 30) * 60  # minutes
@@ -330,7 +604,7 @@ class StoreIntegrationEngine:
             'route': optimized_route,
             'total_distance': round(total_distance, 2),
             'estimated_time': round(total_time, 0),
-            'return_distance': round(return_distance, 2) if optimized_route else 0
+            'return_distance': round(return_distance, 2)
         }
     
     def get_store_recommendations(self, shopping_list: List[str], preferences: Dict = None) -> List[Dict]:
@@ -412,7 +686,28 @@ class StoreIntegrationEngine:
         return recommendations
     
     def track_price_history(self, item_name: str, days: int = 30) -> Dict:
-        """Get price history for an item across stores"""
+        """Get price history for an item across stores, cached per (item, days) for PRICE_HISTORY_TTL"""
+        key = (item_name.lower(), days)
+        now = time.monotonic()
+        
+        with self._price_history_lock:
+            cached = self._price_history_cache.get(key)
+            if cached is not None and now - cached[0] <= self.PRICE_HISTORY_TTL:
+                return cached[1]
+        
+        price_history = self._build_price_history(item_name, days)
+        
+        with self._price_history_lock:
+            self._price_history_cache.pop(key, None)
+            if len(self._price_history_cache) >= self.PRICE_HISTORY_CACHE_SIZE:
+                # Evict the oldest entry (dicts keep insertion order)
+                del self._price_history_cache[next(iter(self._price_history_cache))]
+            self._price_history_cache[key] = (now, price_history)
+        
+        return price_history
+    
+    def _build_price_history(self, item_name: str, days: int) -> Dict:
+        """Simulate price history for an item across stores"""
         # Simulate price history data
         price_history = {}
         
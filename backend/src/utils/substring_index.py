@@ -0,0 +1,58 @@
+import bisect
+import itertools
+from typing import Iterable, Optional, Set
+
+class SubstringIndex:
+    """
+    Bidirectional substring lookups over a fixed list of names: which names
+    contain a query, and which names are contained in it
+    """
+    
+    # Joins the names into one searchable string; a query containing it could
+    # match across two names, so such queries fall back to a linear scan
+    SEPARATOR = "\x00"
+    
+    def __init__(self, names: Iterable[str]):
+        self.names = list(names)
+        self.index = {}
+        for idx, name in enumerate(self.names):
+            self.index.setdefault(name, idx)
+        # The joined names with the offset each one starts at, and the distinct
+        # name lengths for window lookups
+        self._text = self.SEPARATOR.join(self.names)
+        self._starts = list(itertools.accumulate((len(name) + 1 for name in self.names[:-1]), initial=0))
+        self._lengths = sorted({len(name) for name in self.names})
+    
+    def matches(self, query: str) -> Set[int]:
+        """Indices of the names that contain, or are contained in, query"""
+        if not query or self.SEPARATOR in query:
+            return {idx for idx, name in enumerate(self.names) if query in name or name in query}
+        
+        found = set()
+        
+        # Names containing the query: find() over the joined text, resuming at
+        # the start of the next name after each hit
+        text, starts = self._text, self._starts
+        pos = text.find(query)
+        while pos != -1:
+            idx = bisect.bisect_right(starts, pos) - 1
+            found.add(idx)
+            if idx + 1 == len(starts):
+                break
+            pos = text.find(query, starts[idx + 1])
+        
+        # Names contained in the query: look up every window whose length
+        # matches some name
+        for length in self._lengths:
+            if length > len(query):
+                break
+            for offset in range(len(query) - length + 1):
+                idx = self.index.get(query[offset:offset + length])
+                if idx is not None:
+                    found.add(idx)
+        
+        return found
+    
+    def first_match(self, query: str) -> Optional[int]:
+        """Lowest index among matches(query), or None"""
+        return min(self.matches(query), default=None)
@@ -17,6 +17,7 @@ from src.models.shopping_list import ShoppingList
 from src.models.purchase_history import PurchaseHistory
 from src.engines.rule_engine import RuleEngine
 from src.engines.recommendation_engine import RecommendationEngine
+from src.engines.recipe_engine import RecipeEngine
 from src.utils.data_manager import DataManager
 from src.utils.expiration_tracker import ExpirationTracker
 
@@ -70,15 +71,27 @@ def test_shopping_list():
     assert shopping_list.item_count == 2
     assert shopping_list.total_quantity == 3
     
+    # Test summary statistics
+    summary = shopping_list.get_summary()
+    assert summary['total_items'] == 2
+    assert summary['total_quantity'] == 3
+    assert summary['categories'] == {'dairy': 2, 'grains': 1}
+    assert summary['organic_count'] == 0
+    
     # Test finding items
     found_item = shopping_list.find_item("bread")
     assert found_item is not None
     assert found_item.name == "bread"
     
+    # Test cached name sets
+    assert shopping_list.lowercased_names == {"bread", "milk"}
+    assert shopping_list.lowercased_name_tokens == {"bread", "milk"}
+    
     # Test removing items
     success = shopping_list.remove_item("bread")
     assert success == True
     assert shopping_list.item_count == 1
+    assert shopping_list.lowercased_names == {"milk"}
     
     # Test serialization
     list_dict = shopping_list.to_dict()
@@ -155,9 +168,49 @@ def test_recommendation_engine():
     health_rating = rec_engine.rate_shopping_list_healthiness(shopping_list)
     assert isinstance(health_rating['overall_score'], (int, float))
     assert health_rating['health_grade'] in ['A', 'B', 'C', 'D', 'F']
+    assert len(health_rating['item_breakdown']) == 2
+    
+    # Summary-only rating skips the per-item breakdown
+    summary_rating = rec_engine.rate_shopping_list_healthiness(shopping_list, include_breakdown=False)
+    assert 'item_breakdown' not in summary_rating
+    assert summary_rating['overall_score'] == health_rating['overall_score']
     
     print("✅ RecommendationEngine tests passed!")
 
+def test_recipe_engine():
+    """Test RecipeEngine recommendation functionality"""
+    print("🧪 Testing RecipeEngine...")
+    
+    recipe_engine = RecipeEngine()
+    preferences = {"preferred_cuisines": ["italian"], "favorite_ingredients": ["tomato"]}
+    
+    recommendations = recipe_engine.get_recipe_recommendations(preferences)
+    assert len(recommendations) > 0
+    
+    # Editing a result must not leak into later (cached) calls
+    recommendations[0]["recommendation_score"] = -1.0
+    recommendations[0]["score_factors"]["time"] = -1.0
+    fresh = recipe_engine.get_recipe_recommendations(preferences)
+    assert fresh[0]["recommendation_score"] >= 0
+    assert fresh[0]["score_factors"]["time"] >= 0
+    
+    # Batch scoring agrees with the single-user path
+    assert recipe_engine.score_all([preferences])[0] == recipe_engine.get_recipe_recommendations(preferences)
+    
+    # Unhashable preference values are scored without the cache
+    nested = recipe_engine.get_recipe_recommendations({**preferences, "notes": {"spicy": True}})
+    assert [rec["recipe"].id for rec in nested] == [rec["recipe"].id for rec in fresh]
+    
+    # Cooking schedule keeps catalog order for equal cook times and skips invalid ids
+    schedule = recipe_engine.optimize_cooking_time(["r006", ["bad-id"], "r002"])["schedule"]
+    assert [step["recipe_id"] for step in schedule] == ["r002", "r006"]
+    
+    # Meal plan totals stay integers for the integer catalog
+    meal_plan = recipe_engine.generate_meal_plan(days=1)
+    assert all(type(value) is int for value in meal_plan[0].total_nutrition.values())
+    
+    print("✅ RecipeEngine tests passed!")
+
 def test_expiration_tracker():
     """Test ExpirationTracker class functionality"""
     print("🧪 Testing ExpirationTracker...")
@@ -205,6 +258,18 @@ def test_data_manager():
     assert loaded_list.item_count == 1
     assert loaded_list.find_item("test_item") is not None
     
+    # Unchanged file is served from the in-process cache, as an independent copy
+    cached_list = data_manager.load_shopping_list()
+    assert cached_list is not loaded_list
+    assert cached_list.to_dict()['items'] == loaded_list.to_dict()['items']
+    
+    # Edits to a loaded list that is never saved must not reach later loads
+    cached_list.find_item("test_item").quantity = 5
+    cached_list.add_item(GroceryItem("unsaved_item", "test_category", 1, "piece"))
+    reloaded_list = data_manager.load_shopping_list()
+    assert reloaded_list.item_count == 1
+    assert reloaded_list.find_item("test_item").quantity == 1
+    
     # Test purchase history save/load
     purchase_history = PurchaseHistory()
     purchase_history.add_purchase(GroceryItem("test_purchase", "test_category", 1, "piece"))
@@ -282,6 +347,7 @@ def run_all_tests():
         test_purchase_history()
         test_rule_engine()
         test_recommendation_engine()
+        test_recipe_engine()
         test_expiration_tracker()
         test_data_manager()
         create_demo_data()
@@ -0,0 +1,121 @@
+"""
+Setup script tests: seeding and JSON migration against a throwaway SQLite database
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from sqlalchemy import MetaData, UniqueConstraint, create_engine, func, insert, select
+
+import setup_database
+from src.database import Base, SessionLocal
+from src.database.models import Category, Item, Purchase, ShoppingListItem, Store, User
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+@contextmanager
+def temporary_database():
+    """Point the setup script and sessions at an empty SQLite file, with a copy of the JSON data"""
+    tmp_dir = tempfile.mkdtemp()
+    shutil.copytree(DATA_DIR, os.path.join(tmp_dir, 'data'))
+    test_engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'test.db')}")
+    
+    original_engine = setup_database.engine
+    original_cwd = os.getcwd()
+    setup_database.engine = test_engine
+    SessionLocal.configure(bind=test_engine)
+    os.chdir(tmp_dir)
+    try:
+        yield test_engine
+    finally:
+        os.chdir(original_cwd)
+        SessionLocal.configure(bind=original_engine)
+        setup_database.engine = original_engine
+        test_engine.dispose()
+        shutil.rmtree(tmp_dir)
+
+def _count(engine, model):
+    """Number of rows in a model's table"""
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(model))
+
+def test_migration_is_repeatable():
+    """Running the JSON migration twice leaves one copy of the data"""
+    print("🧪 Testing repeated JSON migration...")
+    
+    with temporary_database() as engine:
+        Base.metadata.create_all(engine)
+        assert setup_database.seed_database()
+        
+        assert setup_database.migrate_json_data()
+        purchases = _count(engine, Purchase)
+        list_items = _count(engine, ShoppingListItem)
+        assert purchases > 0 and list_items > 0
+        
+        assert setup_database.migrate_json_data()
+        assert _count(engine, Purchase) == purchases
+        assert _count(engine, ShoppingListItem) == list_items
+    
+    print("✅ Repeated migration tests passed!")
+
+def test_migration_without_purchase_history_keeps_purchases():
+    """Re-running the migration with no purchase history file leaves existing purchases alone"""
+    print("🧪 Testing migration without purchase history...")
+    
+    with temporary_database() as engine:
+        Base.metadata.create_all(engine)
+        assert setup_database.seed_database()
+        assert setup_database.migrate_json_data()
+        purchases = _count(engine, Purchase)
+        assert purchases > 0
+        
+        os.remove(os.path.join('data', 'purchase_history.json'))
+        assert setup_database.migrate_json_data()
+        assert _count(engine, Purchase) == purchases
+    
+    print("✅ Migration without purchase history tests passed!")
+
+def test_seed_adds_unique_keys_to_existing_schema():
+    """Seeding a database created before the unique keys merges duplicates and stays idempotent"""
+    print("🧪 Testing seeding of a pre-constraint schema...")
+    
+    with temporary_database() as engine:
+        # Schema as created before uq_item_name_category / uq_store_name_address existed
+        legacy = MetaData()
+        for table in Base.metadata.sorted_tables:
+            legacy_table = table.to_metadata(legacy)
+            for constraint in list(legacy_table.constraints):
+                if isinstance(constraint, UniqueConstraint) and constraint.name in (
+                        'uq_item_name_category', 'uq_store_name_address'):
+                    legacy_table.constraints.remove(constraint)
+        legacy.create_all(engine)
+        
+        # Two earlier plain seeds, with a purchase pointing at a duplicate item
+        with engine.begin() as conn:
+            conn.execute(insert(User), [setup_database.DEFAULT_USER_ROW])
+            conn.execute(insert(Category), setup_database.CATEGORY_ROWS)
+            for _ in range(2):
+                conn.execute(insert(Item), setup_database.ITEM_ROWS)
+                conn.execute(insert(Store), setup_database.STORE_ROWS)
+            duplicate_item_id = len(setup_database.ITEM_ROWS) + 1
+            conn.execute(insert(Purchase), [{
+                'user_id': 1, 'item_id': duplicate_item_id, 'quantity': 1,
+                'unit': 'kg', 'price_per_unit': 1.0, 'total_price': 1.0
+            }])
+        
+        for _ in range(2):
+            assert setup_database.seed_database()
+            assert _count(engine, Item) == len(setup_database.ITEM_ROWS)
+            assert _count(engine, Store) == len(setup_database.STORE_ROWS)
+        
+        # The purchase now points at the surviving copy of its item
+        with engine.connect() as conn:
+            assert conn.scalar(select(Purchase.item_id)) == 1
+    
+    print("✅ Pre-constraint seeding tests passed!")
+
+if __name__ == "__main__":
+    test_migration_is_repeatable()
+    test_migration_without_purchase_history_keeps_purchases()
+    test_seed_adds_unique_keys_to_existing_schema()